@@ -0,0 +1,105 @@
+"""
+Mide el tiempo de importación y de arranque de la aplicación.
+
+Cada medición se hace en un intérprete nuevo (para que no influyan módulos
+ya cargados) y se repite varias veces; se toma la mediana. Si alguna supera
+su umbral, o si el modelo/controlador arrastran módulos gráficos, el script
+termina con código 1.
+
+Uso (desde la raíz del proyecto):
+
+    python benchmarks/arranque.py [--repeticiones N] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Umbrales en segundos
+UMBRALES = {
+    "importar_modelo": 0.08,
+    "importar_controlador": 0.10,
+    "importar_vista": 0.25,
+    "mostrar_ventana": 1.00,
+}
+
+# Módulos que no deben cargarse al importar el modelo o el controlador
+MODULOS_GRAFICOS = ("tkinter", "matplotlib")
+
+_PLANTILLA = """
+import sys, time, json
+t0 = time.perf_counter()
+{codigo}
+t = time.perf_counter() - t0
+print(json.dumps({{"t": t, "modulos": sorted(m.split(".")[0] for m in sys.modules)}}))
+"""
+
+MEDICIONES = {
+    "importar_modelo": "import modelo.grafo",
+    "importar_controlador": "import controlador.controlador",
+    "importar_vista": "import vista.interfaz",
+    # hasta que la ventana está dibujada, sin esperar al mapa
+    "mostrar_ventana": (
+        "from vista.interfaz import Vista\n"
+        "from controlador.controlador import Controlador\n"
+        "v = Vista(); Controlador(v); v.update()\n"
+        "t = time.perf_counter() - t0\n"
+        "v.destroy()\n"
+        "print(json.dumps({'t': t, 'modulos': []})); sys.exit(0)"
+    ),
+}
+
+
+def medir(codigo: str) -> dict:
+    salida = subprocess.run(
+        [sys.executable, "-c", _PLANTILLA.format(codigo=codigo)],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def hay_pantalla() -> bool:
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="salida en JSON")
+    args = parser.parse_args()
+
+    resultados = {}
+    fallos = []
+    for nombre, codigo in MEDICIONES.items():
+        if nombre == "mostrar_ventana" and not hay_pantalla():
+            continue
+        muestras = [medir(codigo) for _ in range(args.repeticiones)]
+        mediana = statistics.median(m["t"] for m in muestras)
+        resultados[nombre] = {"mediana": mediana, "umbral": UMBRALES[nombre]}
+        if mediana > UMBRALES[nombre]:
+            fallos.append(f"{nombre}: {mediana:.3f}s > {UMBRALES[nombre]:.3f}s")
+
+        if nombre in ("importar_modelo", "importar_controlador"):
+            cargados = set(muestras[0]["modulos"]).intersection(MODULOS_GRAFICOS)
+            if cargados:
+                fallos.append(f"{nombre}: importa {', '.join(sorted(cargados))}")
+        if nombre == "importar_vista" and "matplotlib" in muestras[0]["modulos"]:
+            fallos.append("importar_vista: matplotlib se importa antes de mostrar el mapa")
+
+    if args.json:
+        print(json.dumps({"resultados": resultados, "fallos": fallos}, indent=2))
+    else:
+        for nombre, r in resultados.items():
+            print(f"{nombre:<22} {r['mediana'] * 1000:8.1f} ms  (umbral {r['umbral'] * 1000:.0f} ms)")
+        for fallo in fallos:
+            print(f"REGRESIÓN  {fallo}")
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
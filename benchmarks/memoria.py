@@ -0,0 +1,83 @@
+"""
+Informe de memoria del grafo sobre un grafo sintético.
+
+Construye un grafo aleatorio de ``--nodos`` nodos y ``--aristas`` aristas
+(ambos reproducibles con ``--semilla``) y muestra ``Grafo.informe_memoria``:
+bytes por estructura, por nodo y por arista. También mide la memoria
+asignada durante la construcción con ``tracemalloc`` y el tiempo de cambiar
+de métrica.
+
+Uso (desde la raíz del proyecto):
+
+    python benchmarks/memoria.py [--nodos N] [--aristas M] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modelo.grafo import Grafo  # noqa: E402
+
+
+def construir(nodos: int, aristas: int, semilla: int) -> Grafo:
+    azar = random.Random(semilla)
+    grafo = Grafo()
+    with grafo.lote():
+        for i in range(nodos):
+            grafo.agregar_nodo(f"nodo-{i:07d}", 40 + azar.random(), -4 + azar.random())
+        for _ in range(aristas):
+            origen, destino = azar.randrange(nodos), azar.randrange(nodos)
+            if origen != destino:
+                grafo.agregar_arista(
+                    f"nodo-{origen:07d}", f"nodo-{destino:07d}", azar.random() < 0.7
+                )
+    return grafo
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodos", type=int, default=100_000)
+    parser.add_argument("--aristas", type=int, default=300_000)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="salida en JSON")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    grafo = construir(args.nodos, args.aristas, args.semilla)
+    segundos_construccion = time.perf_counter() - inicio
+    asignados = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    grafo.cambiar_metrica("haversine")
+    segundos_metrica = time.perf_counter() - inicio
+
+    informe = grafo.informe_memoria()
+    informe.update({
+        "num_nodos": len(grafo.nodos),
+        "num_aristas": len(grafo.aristas),
+        "tracemalloc": asignados,
+        "segundos_construccion": segundos_construccion,
+        "segundos_cambiar_metrica": segundos_metrica,
+    })
+
+    if args.json:
+        print(json.dumps(informe, indent=2))
+    else:
+        for clave, valor in informe.items():
+            if isinstance(valor, float):
+                print(f"{clave:<26} {valor:14.2f}")
+            else:
+                print(f"{clave:<26} {valor:14,d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
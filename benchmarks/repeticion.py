@@ -0,0 +1,237 @@
+"""
+Reproduce un trabajo grabado contra el controlador, sin interfaz gráfica.
+
+El trabajo es un archivo JSON Lines con una operación ``[método, *argumentos]``
+por línea (ver ``controlador/grabador.py``; se graba desde la aplicación con
+la variable de entorno ``NAVEGACION_GRABAR=<archivo>``). Cada cliente carga
+su propia copia del grafo, crea un ``Controlador`` con una ``VistaNula`` y
+reproduce el trabajo completo ``--repeticiones`` veces, tan rápido como
+puede. Con varios clientes, cada uno corre en su propio proceso.
+
+El resultado (latencias p50/p95/p99 por operación y en total, rendimiento
+en operaciones por segundo, errores y pico de memoria) se escribe en JSON,
+junto con la configuración, para comparar ejecuciones sobre el mismo trabajo.
+
+Uso (desde la raíz del proyecto):
+
+    python benchmarks/repeticion.py grafo.json trabajo.jsonl [--clientes N]
+        [--repeticiones R] [--etiquetas] [--metrica M] [--salida informe.json]
+
+    # genera un trabajo sintético de N operaciones sobre el grafo
+    python benchmarks/repeticion.py grafo.json trabajo.jsonl --generar N
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controlador.controlador import Controlador  # noqa: E402
+from controlador.grabador import OPERACIONES  # noqa: E402
+from modelo.grafo import Grafo  # noqa: E402
+from vista.nula import VistaNula  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows: sin pico de memoria
+    resource = None
+
+PERCENTILES = (50, 95, 99)
+
+
+# ---------- trabajos ----------------------------------------------------
+def leer_trabajo(ruta: str) -> List[list]:
+    trabajo = []
+    with open(ruta, "r", encoding="utf-8") as f:
+        for numero, linea in enumerate(f, 1):
+            if not linea.strip():
+                continue
+            operacion = json.loads(linea)
+            if not isinstance(operacion, list) or operacion[0] not in OPERACIONES:
+                raise ValueError(f"Operación no reproducible en la línea {numero}: {linea.strip()}")
+            trabajo.append(operacion)
+    return trabajo
+
+
+def generar_trabajo(grafo: Grafo, n: int, semilla: int = 0, ediciones: float = 0.05) -> List[list]:
+    """
+    Trabajo sintético: rutas simples y con 2–4 paradas entre nodos al azar y,
+    con probabilidad ``ediciones``, pequeños desplazamientos de un nodo.
+    """
+    azar = random.Random(semilla)
+    nombres = list(grafo.nodos)
+    trabajo = []
+    for _ in range(n):
+        tirada = azar.random()
+        if tirada < ediciones:
+            nodo = grafo.nodos[azar.choice(nombres)]
+            trabajo.append([
+                "editar", nodo.nombre,
+                str(nodo.latitud + azar.uniform(-1e-4, 1e-4)),
+                str(nodo.longitud + azar.uniform(-1e-4, 1e-4)),
+            ])
+        elif tirada < 0.75:
+            trabajo.append(["calcular_ruta", *azar.sample(nombres, 2)])
+        else:
+            inicio, fin, *paradas = azar.sample(nombres, 2 + azar.randint(2, 4))
+            trabajo.append(["calcular_ruta_con_paradas", inicio, fin, paradas])
+    return trabajo
+
+
+# ---------- clientes ----------------------------------------------------
+def _memoria_pico() -> int:
+    if resource is None:
+        return 0
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KiB, macOS en bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def _cliente(argumentos) -> Dict:
+    ruta_grafo, trabajo, repeticiones, etiquetas, metrica = argumentos
+    with open(ruta_grafo, "r", encoding="utf-8") as f:
+        grafo = Grafo.from_dict(json.load(f))
+    vista = VistaNula()
+    controlador = Controlador(vista)
+    controlador.instalar_grafo(grafo)
+    if metrica:
+        controlador.cambiar_metrica(metrica)
+    if etiquetas:
+        controlador.construir_etiquetas()
+
+    latencias: Dict[str, List[float]] = {}
+    errores: Dict[str, int] = {}
+    inicio = time.monotonic()
+    for _ in range(repeticiones):
+        for metodo, *args in trabajo:
+            previos = len(vista.errores)
+            t0 = time.perf_counter()
+            getattr(controlador, metodo)(*args)
+            latencias.setdefault(metodo, []).append(time.perf_counter() - t0)
+            if len(vista.errores) > previos:
+                errores[metodo] = errores.get(metodo, 0) + 1
+    fin = time.monotonic()
+    controlador.cerrar()
+    return {
+        "latencias": latencias,
+        "errores": errores,
+        "inicio": inicio,
+        "fin": fin,
+        "memoria_pico": _memoria_pico(),
+    }
+
+
+# ---------- informe -----------------------------------------------------
+def percentil(ordenadas: List[float], p: float) -> float:
+    """Percentil ``p`` por rango más cercano de una lista ya ordenada."""
+    if not ordenadas:
+        return math.nan
+    rango = max(1, math.ceil(p / 100 * len(ordenadas)))
+    return ordenadas[rango - 1]
+
+
+def _estadisticas(latencias: List[float], errores: int) -> Dict:
+    ordenadas = sorted(latencias)
+    resultado = {"operaciones": len(ordenadas), "errores": errores}
+    for p in PERCENTILES:
+        resultado[f"p{p}_ms"] = percentil(ordenadas, p) * 1000
+    resultado["media_ms"] = sum(ordenadas) / len(ordenadas) * 1000 if ordenadas else math.nan
+    resultado["max_ms"] = ordenadas[-1] * 1000 if ordenadas else math.nan
+    return resultado
+
+
+def resumir(clientes: List[Dict], configuracion: Dict) -> Dict:
+    por_metodo: Dict[str, List[float]] = {}
+    errores: Dict[str, int] = {}
+    for cliente in clientes:
+        for metodo, lista in cliente["latencias"].items():
+            por_metodo.setdefault(metodo, []).extend(lista)
+        for metodo, n in cliente["errores"].items():
+            errores[metodo] = errores.get(metodo, 0) + n
+
+    todas = [t for lista in por_metodo.values() for t in lista]
+    segundos = max(c["fin"] for c in clientes) - min(c["inicio"] for c in clientes)
+    return {
+        "configuracion": configuracion,
+        "total": _estadisticas(todas, sum(errores.values())),
+        "por_operacion": {
+            metodo: _estadisticas(lista, errores.get(metodo, 0))
+            for metodo, lista in sorted(por_metodo.items())
+        },
+        "segundos": segundos,
+        "operaciones_por_segundo": len(todas) / segundos if segundos > 0 else math.nan,
+        "memoria_pico_bytes": max(c["memoria_pico"] for c in clientes),
+        "memoria_pico_total_bytes": sum(c["memoria_pico"] for c in clientes),
+    }
+
+
+def reproducir(
+    ruta_grafo: str,
+    trabajo: List[list],
+    clientes: int = 1,
+    repeticiones: int = 1,
+    etiquetas: bool = False,
+    metrica: str = None,
+) -> Dict:
+    argumentos = (ruta_grafo, trabajo, repeticiones, etiquetas, metrica)
+    if clientes == 1:
+        resultados = [_cliente(argumentos)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=clientes) as ejecutor:
+            resultados = list(ejecutor.map(_cliente, [argumentos] * clientes))
+    return resumir(resultados, {
+        "grafo": os.path.abspath(ruta_grafo),
+        "operaciones_trabajo": len(trabajo),
+        "clientes": clientes,
+        "repeticiones": repeticiones,
+        "etiquetas": etiquetas,
+        "metrica": metrica,
+        "python": sys.version.split()[0],
+    })
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("grafo", help="archivo JSON del grafo")
+    parser.add_argument("trabajo", help="archivo JSON Lines con las operaciones")
+    parser.add_argument("--clientes", type=int, default=1)
+    parser.add_argument("--repeticiones", type=int, default=1)
+    parser.add_argument("--etiquetas", action="store_true",
+                        help="construir el oráculo de etiquetas de hubs antes de reproducir")
+    parser.add_argument("--metrica", help="métrica con la que se calculan los pesos")
+    parser.add_argument("--salida", help="escribir el informe JSON en este archivo")
+    parser.add_argument("--generar", type=int, metavar="N",
+                        help="generar un trabajo sintético de N operaciones en lugar de reproducir")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.generar:
+        with open(args.grafo, "r", encoding="utf-8") as f:
+            grafo = Grafo.from_dict(json.load(f))
+        with open(args.trabajo, "w", encoding="utf-8") as f:
+            for operacion in generar_trabajo(grafo, args.generar, args.semilla):
+                f.write(json.dumps(operacion, ensure_ascii=False) + "\n")
+        return 0
+
+    informe = reproducir(
+        args.grafo, leer_trabajo(args.trabajo),
+        args.clientes, args.repeticiones, args.etiquetas, args.metrica,
+    )
+    texto = json.dumps(informe, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    print(texto)
+    return 1 if informe["total"]["errores"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,13 @@
+import math
+import os
+from typing import Optional
+
 from modelo.grafo import Grafo
-import json
+from modelo import exportar, flota
+from modelo.carga import Carga
+from modelo.diario import Diario
+from modelo.etiquetas import EtiquetasHub
+from modelo.paradas import MatrizParadas
 
 
 class Controlador:
@@ -10,31 +18,52 @@ class Controlador:
     def __init__(self, vista):
         self.vista = vista
         self.grafo = Grafo()
+        # la vista se actualiza con los cambios que notifica el grafo
+        self.grafo.suscribir(self._al_cambiar_grafo)
+        # matriz de tramos entre paradas reutilizada entre cálculos
+        self._matriz = None
+        self._ultima_secuencia = None
+        # oráculo de distancias por etiquetas de hubs (se construye bajo demanda)
+        self.etiquetas = None
+        # diario de operaciones del archivo abierto (None hasta guardar o cargar)
+        self.diario = None
+        # carga en segundo plano sin resolver (ver ``iniciar_carga``) y, si
+        # se soltó el diario para ella, (ruta, secuencia, versión del grafo)
+        self.carga = None
+        self._diario_suelto = None
+        # rutas mostradas en el mapa, como (nombre, camino), para exportarlas
+        self.rutas_mostradas = []
         # la vista nos necesita para llamar a las acciones
         self.vista.set_controlador(self)
 
+    def _al_cambiar_grafo(self, cambios) -> None:
+        # al repintar, el mapa deja de mostrar la ruta: tampoco se exporta
+        self.rutas_mostradas = []
+        self.vista.aplicar_cambios(cambios)
+
+    def lote(self):
+        """
+        Agrupa varias operaciones del controlador en un único lote del grafo,
+        de modo que la vista se actualiza una sola vez al final.
+        """
+        return self.grafo.lote()
+
     # ---------- CRUD sobre nodos ------------------------------------
     def agregar(self, nombre: str, lat: str, lon: str):
         try:
             self.grafo.agregar_nodo(nombre, float(lat), float(lon))
-            self.vista.actualizar_lista(self.grafo.nodos.keys())
-            self.vista.actualizar_aristas(self.grafo.obtener_aristas())
         except Exception as e:
             self.vista.mostrar_error(str(e))
 
     def editar(self, nombre: str, lat: str, lon: str):
         try:
             self.grafo.editar_nodo(nombre, float(lat), float(lon))
-            self.vista.actualizar_lista(self.grafo.nodos.keys())
-            self.vista.actualizar_aristas(self.grafo.obtener_aristas())
         except Exception as e:
             self.vista.mostrar_error(str(e))
 
     def eliminar(self, nombre: str):
         try:
             self.grafo.eliminar_nodo(nombre)
-            self.vista.actualizar_lista(self.grafo.nodos.keys())
-            self.vista.actualizar_aristas(self.grafo.obtener_aristas())
         except Exception as e:
             self.vista.mostrar_error(str(e))
 
@@ -42,26 +71,32 @@ class Controlador:
     def agregar_arista(self, origen: str, destino: str, bidireccional: bool = True):
         try:
             self.grafo.agregar_arista(origen, destino, bidireccional)
-            self.vista.actualizar_aristas(self.grafo.obtener_aristas())
         except Exception as e:
             self.vista.mostrar_error(str(e))
 
     def eliminar_arista(self, origen: str, destino: str):
         try:
             self.grafo.eliminar_arista(origen, destino)
-            self.vista.actualizar_aristas(self.grafo.obtener_aristas())
+        except Exception as e:
+            self.vista.mostrar_error(str(e))
+
+    def cambiar_metrica(self, metrica: str):
+        try:
+            self.grafo.cambiar_metrica(metrica)
         except Exception as e:
             self.vista.mostrar_error(str(e))
 
     # ---------- rutas -----------------------------------------------
     def calcular_ruta(self, inicio: str, fin: str):
         try:
-            resultado = self.grafo.dijkstra(inicio, fin)
+            resultado = self.grafo.a_estrella(inicio, fin)
+            self.rutas_mostradas = []
             if resultado is None:
                 self.vista.mostrar_ruta("No existe una ruta entre los nodos seleccionados.")
                 self.vista.actualizar_aristas(self.grafo.obtener_aristas())
             else:
                 camino, distancia = resultado
+                self.rutas_mostradas = [(f"{inicio} → {fin}", camino)]
                 texto = f"Ruta: {' → '.join(camino)} | Distancia: {distancia:.2f}"
                 self.vista.mostrar_ruta(texto)
                 self.vista.actualizar_aristas(self.grafo.obtener_aristas(), camino)
@@ -82,62 +117,35 @@ class Controlador:
                 # Si no hay puntos intermedios, simplemente calcula la ruta directa
                 return self.calcular_ruta(inicio, fin)
                 
-            # Crear una matriz de distancias entre todos los puntos (incluidos inicio y fin)
+            # Reutiliza la matriz de tramos del cálculo anterior: sólo se
+            # calculan las filas/columnas de los puntos que han cambiado
             todos_puntos = [inicio] + waypoints + [fin]
-            n_puntos = len(todos_puntos)
-            
-            # Matriz para almacenar distancias entre todos los pares de puntos
-            matriz_distancias = {}
-            caminos_entre_puntos = {}
-            
-            # Calcular las distancias entre todos los pares de puntos
-            for i in range(n_puntos):
-                origen = todos_puntos[i]
-                for j in range(n_puntos):
-                    if i == j:
-                        continue
-                    destino = todos_puntos[j]
-                    resultado = self.grafo.dijkstra(origen, destino)
-                    if resultado is None:
-                        self.vista.mostrar_ruta(f"No existe una ruta entre {origen} y {destino}.")
-                        self.vista.actualizar_aristas(self.grafo.obtener_aristas())
-                        return
-                    
-                    camino, distancia = resultado
-                    matriz_distancias[(origen, destino)] = distancia
-                    caminos_entre_puntos[(origen, destino)] = camino
-            
-            # Encontrar la mejor secuencia de puntos intermedios
-            # Para problemas pequeños, podemos probar todas las permutaciones
-            # En problemas más grandes, se debería usar una heurística más sofisticada
-            
-            import itertools
-            
-            # Solo permutamos los waypoints (mantenemos inicio y fin fijos)
-            mejor_distancia = float('inf')
-            mejor_secuencia = None
-            
-            for perm in itertools.permutations(waypoints):
-                secuencia_actual = [inicio] + list(perm) + [fin]
-                distancia_total = 0
-                
-                # Calcular la distancia total de esta secuencia
-                for i in range(len(secuencia_actual) - 1):
-                    origen = secuencia_actual[i]
-                    destino = secuencia_actual[i + 1]
-                    distancia_total += matriz_distancias[(origen, destino)]
-                
-                # Actualizar la mejor secuencia si esta es mejor
-                if distancia_total < mejor_distancia:
-                    mejor_distancia = distancia_total
-                    mejor_secuencia = secuencia_actual
-            
+            if self._matriz is None or self._matriz.grafo is not self.grafo:
+                self._matriz = MatrizParadas(self.grafo)
+                self._ultima_secuencia = None
+            self._matriz.actualizar(todos_puntos, self._etiquetas_vigentes())
+
+            self.rutas_mostradas = []
+            sin_ruta = self._matriz.primer_tramo_sin_ruta(todos_puntos)
+            if sin_ruta is not None:
+                origen, destino = sin_ruta
+                self.vista.mostrar_ruta(f"No existe una ruta entre {origen} y {destino}.")
+                self.vista.actualizar_aristas(self.grafo.obtener_aristas())
+                return
+
+            # Encontrar la mejor secuencia de puntos intermedios, partiendo de
+            # la mejor secuencia anterior como cota inicial
+            mejor_secuencia, mejor_distancia = self._matriz.mejor_orden(
+                inicio, fin, waypoints, self._ultima_secuencia
+            )
+            self._ultima_secuencia = mejor_secuencia
+
             # Construir la ruta completa con la mejor secuencia
             ruta_completa = []
             for i in range(len(mejor_secuencia) - 1):
                 origen = mejor_secuencia[i]
                 destino = mejor_secuencia[i + 1]
-                camino = caminos_entre_puntos[(origen, destino)]
+                camino = self._matriz.camino(origen, destino)
                 
                 if i == 0:
                     ruta_completa.extend(camino)
@@ -145,6 +153,8 @@ class Controlador:
                     # Evitar duplicar el punto de conexión
                     ruta_completa.extend(camino[1:])
             
+            self.rutas_mostradas = [(" → ".join(mejor_secuencia), ruta_completa)]
+
             # Mostrar la ruta completa
             texto = f"Ruta optimizada: {' → '.join(ruta_completa)} | Distancia total: {mejor_distancia:.2f}"
             self.vista.mostrar_ruta(texto)
@@ -153,27 +163,270 @@ class Controlador:
         except Exception as e:
             self.vista.mostrar_error(str(e))
 
+    def calcular_rutas_flota(
+        self,
+        vehiculos: list,
+        paradas: list,
+        demandas: dict = None,
+        tiempo: float = 2.0,
+        procesos: int = None,
+    ):
+        """
+        Reparte las paradas entre varios vehículos y dibuja una ruta por vehículo.
+
+        Args:
+            vehiculos: Lista de ``flota.Vehiculo`` (inicio, fin y capacidad opcional)
+            paradas: Nodos a visitar, cada uno por un único vehículo
+            demandas: Carga de cada parada (1 si no se indica)
+            tiempo: Segundos de búsqueda por proceso
+            procesos: Procesos en paralelo (por defecto, uno por CPU)
+
+        Returns:
+            Lista de (camino completo, secuencia de paradas) por vehículo, o
+            None si hubo un error.
+        """
+        try:
+            demandas = demandas or {}
+            puntos = list(dict.fromkeys(
+                [v.inicio for v in vehiculos] + [v.fin for v in vehiculos] + list(paradas)
+            ))
+            for punto in puntos:
+                if punto not in self.grafo.nodos:
+                    raise KeyError(f"No existe el nodo «{punto}».")
+            indice = {p: i for i, p in enumerate(puntos)}
+
+            rutas, coste = flota.resolver(
+                self._matriz_costes(puntos),
+                [
+                    (indice[v.inicio], indice[v.fin],
+                     math.inf if v.capacidad is None else v.capacidad)
+                    for v in vehiculos
+                ],
+                [indice[p] for p in paradas],
+                [demandas.get(p, 1.0) for p in paradas],
+                tiempo,
+                procesos,
+            )
+
+            resultado = []
+            for v, ruta in zip(vehiculos, rutas):
+                secuencia = [v.inicio] + [puntos[i] for i in ruta] + [v.fin]
+                camino = [secuencia[0]]
+                for origen, destino in zip(secuencia, secuencia[1:]):
+                    if origen != destino:
+                        tramo = self.grafo.a_estrella(origen, destino)
+                        if tramo is None:
+                            raise ValueError(f"No existe una ruta entre {origen} y {destino}.")
+                        camino.extend(tramo[0][1:])
+                resultado.append((camino, secuencia))
+
+            self.rutas_mostradas = [
+                (f"Vehículo {k + 1}", camino) for k, (camino, _) in enumerate(resultado)
+            ]
+            lineas = [
+                f"Vehículo {k + 1}: {' → '.join(secuencia)}"
+                for k, (_, secuencia) in enumerate(resultado)
+            ]
+            lineas.append(f"Distancia total: {coste:.2f}")
+            self.vista.mostrar_ruta("\n".join(lineas))
+            self.vista.actualizar_aristas(self.grafo.obtener_aristas(), rutas=resultado)
+            return resultado
+        except Exception as e:
+            self.vista.mostrar_error(str(e))
+            return None
+
+    def _matriz_costes(self, puntos: list) -> list:
+        # Con etiquetas vigentes la matriz sale del oráculo; si no, una
+        # búsqueda de Dijkstra por punto hacia todos los demás (reconstruir
+        # las etiquetas no compensa para una sola consulta)
+        etiquetas = self._etiquetas_vigentes()
+        if etiquetas is not None:
+            return etiquetas.matriz(puntos, puntos)
+        matriz = []
+        for origen in puntos:
+            fila = self.grafo.dijkstra_a_varios(origen, puntos)
+            matriz.append([fila[d][1] if d in fila else math.inf for d in puntos])
+        return matriz
+
+    # ---------- distancias sin camino --------------------------------
+    def construir_etiquetas(self) -> dict:
+        """
+        Construye (o reconstruye) el oráculo de distancias por etiquetas de
+        hubs y devuelve sus estadísticas de tamaño y tiempo de construcción.
+        """
+        self.etiquetas = EtiquetasHub(self.grafo)
+        return self.etiquetas.estadisticas()
+
+    def _etiquetas_vigentes(self) -> Optional[EtiquetasHub]:
+        # Las etiquetas sólo sirven si son del grafo actual y están al día
+        etiquetas = self.etiquetas
+        if etiquetas is not None and etiquetas.grafo is self.grafo and etiquetas.vigente():
+            return etiquetas
+        return None
+
+    def _oraculo(self) -> EtiquetasHub:
+        if self._etiquetas_vigentes() is None:
+            self.construir_etiquetas()
+        return self.etiquetas
+
+    def distancia(self, inicio: str, fin: str) -> float:
+        """Distancia mínima entre dos nodos, sin reconstruir el camino."""
+        return self._oraculo().distancia(inicio, fin)
+
+    def matriz_distancias(self, origenes: list, destinos: list) -> list:
+        """Matriz de distancias origenes × destinos (``math.inf`` si no hay ruta)."""
+        return self._oraculo().matriz(origenes, destinos)
+
     # ---------- persistencia ----------------------------------------
-    def guardar_datos(self, ruta: str) -> None:
-        """Guarda el grafo actual en un archivo JSON."""
+    def guardar_datos(self, ruta: str, esperar: bool = False) -> bool:
+        """
+        Guarda el grafo actual en un archivo JSON.
+
+        La instantánea se escribe en segundo plano (``estado_guardado`` dice
+        cuándo termina y muestra el error si falla) o, con ``esperar``, antes
+        de volver. A partir de ahí cada modificación se añade al diario del
+        archivo, así que un cierre inesperado no pierde los cambios
+        posteriores. Devuelve False si el guardado no llegó a empezar.
+        """
         if not ruta:
-            return  # operación cancelada
+            return False  # operación cancelada
+        if self.carga is not None:
+            # la carga instalará su propio diario sobre el archivo
+            self.vista.mostrar_error("No se puede guardar mientras se carga un archivo.")
+            return False
         try:
-            with open(ruta, "w", encoding="utf-8") as f:
-                json.dump(self.grafo.to_dict(), f, ensure_ascii=False, indent=2)
+            if self.diario is None or self.diario.ruta != ruta:
+                if self.diario is not None:
+                    self.diario.cerrar()
+                self.diario = Diario.crear(ruta, self.grafo)
+            self.diario.compactar(esperar=esperar, forzar=True)
+            return True
         except Exception as e:
             self.vista.mostrar_error(f"Error al guardar: {e}")
+            return False
+
+    def estado_guardado(self) -> str:
+        """
+        ``"guardando"`` mientras se escribe la instantánea; después
+        ``"guardado"`` o ``"error"`` (tras mostrar el error en la vista).
+        """
+        diario = self.diario
+        if diario is None:
+            return "guardado"
+        if diario.compactando():
+            return "guardando"
+        try:
+            diario.comprobar_error()
+        except Exception as e:
+            self.vista.mostrar_error(f"Error al guardar: {e}")
+            return "error"
+        return "guardado"
+
+    def exportar(self, ruta: str, tolerancia: float = 0.0) -> None:
+        """
+        Exporta el grafo y las rutas mostradas a GeoJSON o CSV según la
+        extensión de ``ruta`` (``.gz`` para comprimir). Con ``tolerancia`` > 0
+        las rutas se simplifican con Douglas–Peucker.
+        """
+        if not ruta:
+            return  # operación cancelada
+        try:
+            exportar.exportar(self.grafo, ruta, self.rutas_mostradas, tolerancia)
+        except Exception as e:
+            self.vista.mostrar_error(f"Error al exportar: {e}")
 
     def cargar_datos(self, ruta: str) -> None:
-        """Carga un grafo desde un archivo JSON."""
+        """Carga un grafo desde un archivo JSON y reproduce su diario, si lo tiene."""
         if not ruta:
             return  # operación cancelada
+        if self.carga is not None:
+            self.vista.mostrar_error("Ya hay una carga en curso.")
+            return
         try:
-            with open(ruta, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self.grafo = Grafo.from_dict(data)
-            # Actualiza la vista
-            self.vista.actualizar_lista(self.grafo.nodos.keys())
-            self.vista.actualizar_aristas(self.grafo.obtener_aristas())
+            self._soltar_diario(ruta)
+            self.instalar_grafo(*Diario.cargar(ruta))
         except Exception as e:
+            self._recuperar_diario()
             self.vista.mostrar_error(f"Error al cargar: {e}")
+
+    def _soltar_diario(self, ruta: str) -> None:
+        # Si el diario actual es el de ``ruta``, se cierra (esperando a su
+        # compactación) antes de que otro lo abra: una compactación en curso
+        # reemplaza el archivo y el diario nuevo escribiría en uno huérfano.
+        # Desde aquí las ediciones del grafo actual ya no se registran hasta
+        # que ``_recuperar_diario`` lo vuelva a enlazar.
+        if self.diario is not None and os.path.abspath(self.diario.ruta) == os.path.abspath(ruta):
+            diario, self.diario = self.diario, None
+            diario.cerrar()
+            self._diario_suelto = (diario.ruta, diario.secuencia, self.grafo.version)
+
+    def _recuperar_diario(self) -> None:
+        # La carga del archivo del diario soltado no se instaló: el grafo
+        # actual vuelve a registrar sus ediciones en él. Las que se hicieron
+        # mientras tanto no están en el diario, así que en ese caso se
+        # escribe también una instantánea nueva que las incluya.
+        suelto, self._diario_suelto = self._diario_suelto, None
+        if suelto is None or self.diario is not None:
+            return
+        ruta, secuencia, version = suelto
+        self.diario = Diario(ruta, self.grafo, secuencia)
+        if self.grafo.version != version:
+            self.diario.compactar()
+
+    def iniciar_carga(self, ruta: str) -> Optional[Carga]:
+        """
+        Empieza a cargar ``ruta`` en segundo plano y devuelve la ``Carga``.
+
+        El grafo actual sigue en uso hasta que quien consulta los eventos de
+        la carga recibe ``"fin"`` y llama a ``instalar_grafo``; si la carga
+        se cancela o falla debe llamar a ``abandonar_carga``. Hasta entonces
+        no se puede guardar ni empezar otra carga. Si se recarga el archivo
+        del diario actual, el diario se cierra antes (la carga lee su cola)
+        y ``abandonar_carga`` lo vuelve a enlazar al grafo actual.
+        """
+        if not ruta:
+            return None  # operación cancelada
+        if self.carga is not None:
+            self.vista.mostrar_error("Ya hay una carga en curso.")
+            return None
+        self._soltar_diario(ruta)
+        self.carga = Carga(ruta).iniciar()
+        return self.carga
+
+    def abandonar_carga(self) -> None:
+        """Da por terminada, sin instalarla, la carga en curso (cancelada o fallida)."""
+        self.carga = None
+        try:
+            self._recuperar_diario()
+        except Exception as e:
+            self.vista.mostrar_error(f"Error al guardar: {e}")
+
+    def instalar_grafo(self, grafo: Grafo, diario: Optional[Diario] = None) -> None:
+        """Sustituye el grafo actual (y su diario) por uno ya construido."""
+        if self.diario is not None:
+            self.diario.cerrar()
+        self.diario = diario
+        self.carga = None
+        self._diario_suelto = None
+        self.grafo.desuscribir(self._al_cambiar_grafo)
+        self.grafo = grafo
+        self.grafo.suscribir(self._al_cambiar_grafo)
+        # el oráculo es del grafo anterior
+        self.etiquetas = None
+        self.rutas_mostradas = []
+        # Actualiza la vista
+        self.vista.actualizar_lista(self.grafo.nodos.keys())
+        self.vista.actualizar_aristas(self.grafo.obtener_aristas())
+
+    def cerrar(self) -> None:
+        """
+        Termina la compactación pendiente y cierra el diario. Una carga sin
+        resolver se cancela antes, para no perder el diario que soltó.
+        """
+        if self.carga is not None:
+            self.carga.cancelar()
+            self.carga.esperar()
+            self.abandonar_carga()
+        if self.diario is not None:
+            self.diario.cerrar()
+            self.diario = None
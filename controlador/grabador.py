@@ -0,0 +1,52 @@
+"""
+Grabación de las consultas y ediciones que recibe un ``Controlador``.
+
+Cada llamada a una de las ``OPERACIONES`` se añade como una línea JSON
+``[método, *argumentos]`` (el mismo formato que el diario, sin secuencia) a
+un archivo de trabajo que ``benchmarks/repeticion.py`` puede reproducir.
+"""
+
+import json
+import threading
+
+# Métodos del controlador que se graban y se pueden reproducir
+OPERACIONES = (
+    "calcular_ruta",
+    "calcular_ruta_con_paradas",
+    "agregar",
+    "editar",
+    "eliminar",
+    "agregar_arista",
+    "eliminar_arista",
+    "cambiar_metrica",
+)
+
+
+class Grabador:
+    """
+    Envuelve un controlador: las ``OPERACIONES`` se graban antes de
+    delegarlas y cualquier otro atributo se delega sin más.
+    """
+
+    def __init__(self, controlador, ruta: str) -> None:
+        self._controlador = controlador
+        self._lock = threading.Lock()
+        self._archivo = open(ruta, "a", encoding="utf-8", newline="")
+
+    def __getattr__(self, nombre: str):
+        atributo = getattr(self._controlador, nombre)
+        if nombre not in OPERACIONES:
+            return atributo
+
+        def grabada(*argumentos):
+            with self._lock:
+                self._archivo.write(json.dumps([nombre, *argumentos], ensure_ascii=False) + "\n")
+                self._archivo.flush()
+            return atributo(*argumentos)
+
+        return grabada
+
+    def cerrar(self) -> None:
+        with self._lock:
+            self._archivo.close()
+        self._controlador.cerrar()
@@ -8,14 +8,22 @@ Asume que los archivos:
 están en el mismo directorio que main.py.
 """
 
+import os
+
 from vista.interfaz import Vista
 from controlador.controlador import Controlador
+from controlador.grabador import Grabador
 
 
 def main() -> None:
     vista = Vista()
-    Controlador(vista)  # inyecta el controlador en la vista
+    controlador = Controlador(vista)  # inyecta el controlador en la vista
+    if os.environ.get("NAVEGACION_GRABAR"):
+        # graba las consultas y ediciones para benchmarks/repeticion.py
+        controlador = Grabador(controlador, os.environ["NAVEGACION_GRABAR"])
+        vista.set_controlador(controlador)
     vista.mainloop()    # lanza la GUI
+    controlador.cerrar()  # espera a que termine de escribirse el diario
 
 
 if __name__ == "__main__":
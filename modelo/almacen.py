@@ -0,0 +1,117 @@
+"""
+Almacenes de nodos y de aristas en estructura de arrays.
+
+Cada nombre de nodo se guarda una sola vez y se asocia a un identificador
+denso; las coordenadas viven en dos arrays contiguos de ``float64`` indexados
+por ese identificador. El resto del grafo (adyacencia, aristas, índice)
+reutiliza el mismo objeto ``str`` del almacén en lugar de copias del nombre.
+
+Los identificadores de nodos eliminados se reutilizan al agregar otros, así
+que los arrays no crecen con el número de altas y bajas. Las aristas siguen
+el mismo esquema en ``AlmacenAristas``.
+"""
+
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+
+class AlmacenNodos:
+    def __init__(self) -> None:
+        # nombre → id; la clave es el objeto canónico del nombre
+        self.ids: Dict[str, int] = {}
+        # id → nombre (None en los huecos de nodos eliminados)
+        self.nombres: List[Optional[str]] = []
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self._libres: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, nombre: str) -> bool:
+        return nombre in self.ids
+
+    def agregar(self, nombre: str, latitud: float, longitud: float) -> int:
+        nombre = sys.intern(nombre)
+        if self._libres:
+            id = self._libres.pop()
+            self.nombres[id] = nombre
+            self.latitudes[id] = latitud
+            self.longitudes[id] = longitud
+        else:
+            id = len(self.nombres)
+            self.nombres.append(nombre)
+            self.latitudes.append(latitud)
+            self.longitudes.append(longitud)
+        self.ids[nombre] = id
+        return id
+
+    def eliminar(self, nombre: str) -> None:
+        id = self.ids.pop(nombre)
+        self.nombres[id] = None
+        self.latitudes[id] = self.longitudes[id] = float("nan")
+        self._libres.append(id)
+
+    def canonico(self, nombre: str) -> str:
+        """El objeto ``str`` que el almacén guarda para ``nombre``."""
+        return self.nombres[self.ids[nombre]]
+
+    def bytes(self) -> Dict[str, int]:
+        """Memoria ocupada por el almacén, por estructura (aproximada, en bytes)."""
+        return {
+            "coordenadas": (
+                sys.getsizeof(self.latitudes) + sys.getsizeof(self.longitudes)
+            ),
+            "nombres": sum(sys.getsizeof(n) for n in self.ids),
+            # los enteros pequeños están precreados; el resto son objetos propios
+            "ids": sys.getsizeof(self.ids) + sys.getsizeof(self.nombres)
+            + sys.getsizeof(self._libres)
+            + sum(sys.getsizeof(i) for i in self.ids.values() if i > 256),
+        }
+
+
+class AlmacenAristas:
+    """
+    Extremos y pesos de las aristas en arrays contiguos, por identificador
+    denso de arista. Los extremos son ids del ``AlmacenNodos``, así que los
+    pesos de todas las aristas se recalculan con un único cálculo por lotes
+    y se escriben en ``pesos`` de una vez. Como en los nodos, los ids de
+    aristas eliminadas se reutilizan.
+    """
+
+    def __init__(self) -> None:
+        self.origenes = array("i")
+        self.destinos = array("i")
+        self.pesos = array("d")
+        self._libres: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.pesos) - len(self._libres)
+
+    def agregar(self, origen: int, destino: int, peso: float) -> int:
+        if self._libres:
+            id = self._libres.pop()
+            self.origenes[id] = origen
+            self.destinos[id] = destino
+            self.pesos[id] = peso
+        else:
+            id = len(self.pesos)
+            self.origenes.append(origen)
+            self.destinos.append(destino)
+            self.pesos.append(peso)
+        return id
+
+    def eliminar(self, id: int) -> None:
+        # los huecos apuntan al nodo 0 para que el cálculo por lotes siga
+        # siendo válido; su peso no lo lee nadie
+        self.origenes[id] = self.destinos[id] = 0
+        self.pesos[id] = float("nan")
+        self._libres.append(id)
+
+    def bytes(self) -> int:
+        """Memoria ocupada por los arrays del almacén (aproximada, en bytes)."""
+        return (
+            sys.getsizeof(self.origenes) + sys.getsizeof(self.destinos)
+            + sys.getsizeof(self.pesos) + sys.getsizeof(self._libres)
+        )
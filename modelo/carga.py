@@ -0,0 +1,82 @@
+"""
+Carga de un grafo en segundo plano, con progreso y cancelación.
+
+El grafo nuevo se construye en un hilo aparte y no se comparte con nadie
+hasta que termina, así que el grafo actual sigue usándose con normalidad
+mientras tanto. El hilo sólo se comunica mediante una cola de eventos que
+quien la lanzó (p. ej. la interfaz, con ``after``) consulta periódicamente:
+
+- ``("progreso", fase, hechos, total, bloque)``: ``fase`` es ``"leyendo"``,
+  ``"nodos"``, ``"aristas"`` o ``"diario"``; con ``"nodos"``, ``bloque`` son
+  los nodos recién agregados (diccionarios con ``nombre``, ``lat``, ``lon``).
+- ``("fin", grafo, diario)``: el grafo cargado y su diario.
+- ``("cancelada",)`` o ``("error", excepcion)``.
+"""
+
+import queue
+import threading
+from typing import List, Optional, Tuple
+
+from modelo.diario import Diario
+
+
+class CargaCancelada(Exception):
+    pass
+
+
+class Carga:
+    def __init__(self, ruta: str) -> None:
+        self.ruta = ruta
+        self._eventos: "queue.Queue[Tuple]" = queue.Queue()
+        self._cancelar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> "Carga":
+        # daemon: cerrar la aplicación no espera a una carga a medias
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self._hilo.start()
+        return self
+
+    def cancelar(self) -> None:
+        """Pide que la carga se detenga en el próximo bloque."""
+        self._cancelar.set()
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelar.is_set()
+
+    def activa(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def esperar(self, tiempo: Optional[float] = None) -> None:
+        if self._hilo is not None:
+            self._hilo.join(tiempo)
+
+    def eventos(self) -> List[Tuple]:
+        """Devuelve, sin bloquear, los eventos acumulados desde la última llamada."""
+        pendientes = []
+        while True:
+            try:
+                pendientes.append(self._eventos.get_nowait())
+            except queue.Empty:
+                return pendientes
+
+    def _ejecutar(self) -> None:
+        try:
+            grafo, diario = Diario.cargar(self.ruta, self._al_avanzar)
+        except CargaCancelada:
+            self._eventos.put(("cancelada",))
+        except Exception as e:
+            self._eventos.put(("error", e))
+        else:
+            if self._cancelar.is_set():
+                # cancelada después del último bloque: no se entrega
+                diario.cerrar()
+                self._eventos.put(("cancelada",))
+            else:
+                self._eventos.put(("fin", grafo, diario))
+
+    def _al_avanzar(self, fase: str, hechos: int, total: int, bloque) -> None:
+        if self._cancelar.is_set():
+            raise CargaCancelada()
+        self._eventos.put(("progreso", fase, hechos, total, bloque))
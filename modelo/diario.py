@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+from typing import Callable, Optional, Tuple
+
+from modelo.grafo import Grafo, Cambios
+
+# tamaño de los bloques en que se lee la instantánea cuando se informa del progreso
+BLOQUE_LECTURA = 1 << 20
+
+# Métodos del grafo que puede contener un diario; cualquier otro nombre se
+# trata como una línea dañada
+OPERACIONES = (
+    "agregar_nodo",
+    "editar_nodo",
+    "eliminar_nodo",
+    "agregar_arista",
+    "eliminar_arista",
+    "cambiar_metrica",
+)
+
+
+class Diario:
+    """
+    Diario de operaciones (write-ahead log) asociado a una instantánea JSON.
+
+    Cada operación CRUD del grafo se añade como una línea ``[secuencia,
+    método, *argumentos]`` al archivo ``<ruta>.diario``. La instantánea
+    (``<ruta>``) guarda la secuencia de la última operación que incluye, de
+    modo que al cargar sólo hay que reproducir la cola posterior del diario.
+
+    La compactación (escribir una instantánea nueva y recortar el diario) se
+    hace en un hilo aparte y siempre mediante renombrado atómico.
+    """
+
+    # operaciones acumuladas tras las que se compacta automáticamente
+    UMBRAL_COMPACTACION = 10000
+
+    def __init__(self, ruta: str, grafo: Grafo, secuencia: int = 0) -> None:
+        self.ruta = ruta
+        self.ruta_diario = ruta + ".diario"
+        self.grafo = grafo
+        self.secuencia = secuencia
+        # secuencia incluida en la última instantánea escrita
+        self._secuencia_instantanea = secuencia
+        self._lock = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+        self._error: Optional[Exception] = None
+        # se abre con la primera operación: cargar un archivo sin editarlo no
+        # crea ``<ruta>.diario`` (ni falla en una carpeta de sólo lectura)
+        self._archivo = None
+        self.grafo.suscribir(self.registrar)
+
+    @classmethod
+    def crear(cls, ruta: str, grafo: Grafo) -> "Diario":
+        """Empieza un diario nuevo para ``ruta``, descartando uno anterior si lo hubiera."""
+        if os.path.exists(ruta + ".diario"):
+            os.remove(ruta + ".diario")
+        return cls(ruta, grafo)
+
+    # ---------- escritura -------------------------------------------
+    def registrar(self, cambios: Cambios) -> None:
+        """Añade al diario las operaciones de un lote (observador del grafo)."""
+        if not cambios.operaciones:
+            return
+        with self._lock:
+            lineas = []
+            for operacion in cambios.operaciones:
+                self.secuencia += 1
+                lineas.append(json.dumps([self.secuencia, *operacion], ensure_ascii=False))
+            if self._archivo is None:
+                self._archivo = open(self.ruta_diario, "a", encoding="utf-8", newline="")
+            self._archivo.write("\n".join(lineas) + "\n")
+            self._archivo.flush()
+        if self.secuencia - self._secuencia_instantanea >= self.UMBRAL_COMPACTACION:
+            self.compactar()
+
+    def compactar(self, esperar: bool = False, forzar: bool = False) -> None:
+        """
+        Escribe una instantánea del grafo y recorta el diario.
+
+        El grafo se copia a un diccionario en el hilo que llama (para que la
+        instantánea sea coherente); la serialización y la escritura a disco
+        se hacen en segundo plano. Si ya hay una compactación en curso, no se
+        lanza otra, salvo con ``forzar`` (un guardado explícito): entonces se
+        espera a que termine y se escribe otra con el estado actual.
+        """
+        self.comprobar_error()
+        if self.compactando():
+            if not forzar:
+                if esperar:
+                    self._hilo.join()
+                return
+            self._hilo.join()
+            self.comprobar_error()
+
+        with self._lock:
+            datos = self.grafo.to_dict()
+            datos["secuencia"] = self.secuencia
+        self._hilo = threading.Thread(target=self._escribir_instantanea, args=(datos,))
+        self._hilo.start()
+        if esperar:
+            self._hilo.join()
+            self.comprobar_error()
+
+    def compactando(self) -> bool:
+        """Indica si hay una instantánea escribiéndose en segundo plano."""
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def cerrar(self) -> None:
+        """Espera a la compactación pendiente y deja de registrar operaciones."""
+        self.grafo.desuscribir(self.registrar)
+        if self._hilo is not None:
+            self._hilo.join()
+        with self._lock:
+            if self._archivo is not None:
+                self._archivo.close()
+                self._archivo = None
+        self.comprobar_error()
+
+    def _escribir_instantanea(self, datos: dict) -> None:
+        try:
+            _escribir_atomico(
+                self.ruta,
+                lambda f: json.dump(datos, f, ensure_ascii=False, indent=2),
+            )
+            self._secuencia_instantanea = datos["secuencia"]
+            self._recortar(datos["secuencia"])
+        except Exception as e:
+            self._error = e
+
+    def _recortar(self, secuencia: int) -> None:
+        # Conserva sólo las operaciones posteriores a la instantánea; el lock
+        # impide que se registren operaciones mientras se reescribe el diario
+        with self._lock:
+            if self._archivo is not None:
+                # se vuelve a abrir (sobre el archivo nuevo) con la próxima operación
+                self._archivo.close()
+                self._archivo = None
+            if not os.path.exists(self.ruta_diario):
+                return
+            cola = [
+                linea for registro, linea in _leer_diario(self.ruta_diario)
+                if registro[0] > secuencia
+            ]
+            _escribir_atomico(self.ruta_diario, lambda f: f.writelines(cola))
+
+    def comprobar_error(self) -> None:
+        """Lanza (una sola vez) el error de la última compactación, si falló."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    # ---------- lectura ---------------------------------------------
+    @classmethod
+    def cargar(
+        cls, ruta: str, al_avanzar: Optional[Callable[[str, int, int, list], None]] = None
+    ) -> Tuple[Grafo, "Diario"]:
+        """
+        Carga la instantánea de ``ruta`` y reproduce la cola del diario.
+
+        Devuelve el grafo y un diario ya enlazado a él. Una última línea
+        incompleta (p. ej. por un cierre inesperado) se descarta.
+
+        ``al_avanzar`` recibe el progreso como en ``Grafo.from_dict``, más la
+        fase ``"leyendo"`` (bytes leídos del archivo). Si lanza una excepción
+        la carga se interrumpe sin haber tocado el diario.
+        """
+        if al_avanzar is None:
+            with open(ruta, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        else:
+            total = os.path.getsize(ruta)
+            partes = []
+            with open(ruta, "rb") as f:
+                for parte in iter(lambda: f.read(BLOQUE_LECTURA), b""):
+                    partes.append(parte)
+                    al_avanzar("leyendo", f.tell(), total, None)
+            data = json.loads(b"".join(partes).decode("utf-8"))
+        grafo = Grafo.from_dict(data, al_avanzar)
+        secuencia = data.get("secuencia", 0)
+
+        ruta_diario = ruta + ".diario"
+        validos = 0
+        tamano_diario = os.path.getsize(ruta_diario) if os.path.exists(ruta_diario) else 0
+        with grafo.lote():
+            for n, (registro, linea) in enumerate(_leer_diario(ruta_diario), 1):
+                validos += len(linea.encode("utf-8"))
+                sec, metodo, *argumentos = registro
+                if sec <= secuencia:
+                    continue
+                getattr(grafo, metodo)(*argumentos)
+                secuencia = sec
+                if al_avanzar is not None and n % 5000 == 0:
+                    al_avanzar("diario", validos, tamano_diario, None)
+        if os.path.exists(ruta_diario) and os.path.getsize(ruta_diario) > validos:
+            # descarta la cola dañada para que las nuevas líneas no se mezclen con ella
+            with open(ruta_diario, "r+b") as f:
+                f.truncate(validos)
+
+        diario = cls(ruta, grafo, secuencia)
+        diario._secuencia_instantanea = data.get("secuencia", 0)
+        return grafo, diario
+
+
+def _leer_diario(ruta: str):
+    """Genera (registro, línea) de un diario, deteniéndose en la primera línea dañada."""
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, "r", encoding="utf-8", newline="") as f:
+        for linea in f:
+            if not linea.endswith("\n"):
+                break
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                break
+            if (
+                not isinstance(registro, list) or len(registro) < 2
+                or not isinstance(registro[0], int) or registro[1] not in OPERACIONES
+            ):
+                break
+            yield registro, linea
+
+
+def _escribir_atomico(ruta: str, escribir) -> None:
+    """Escribe en un temporal junto a ``ruta`` y lo renombra sobre ella."""
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8", newline="") as f:
+        escribir(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
@@ -0,0 +1,170 @@
+import heapq
+import math
+import time
+from array import array
+from typing import Dict, List
+
+from modelo.grafo import Grafo
+
+
+class EtiquetasHub:
+    """
+    Oráculo de distancias por etiquetado de hubs (pruned landmark labeling).
+
+    Cada nodo guarda dos etiquetas: los hubs que alcanza (salida) y los hubs
+    desde los que se le alcanza (entrada), con sus distancias. La distancia
+    u → v es el mínimo de ``salida[u][h] + entrada[v][h]`` sobre los hubs
+    comunes, que se obtiene mezclando dos arrays ordenados sin recorrer el
+    grafo. Las etiquetas sólo son válidas para la ``Grafo.version`` con la
+    que se construyeron.
+    """
+
+    def __init__(self, grafo: Grafo) -> None:
+        self.grafo = grafo
+        self.version = grafo.version
+        inicio = time.perf_counter()
+
+        # Los nodos de mayor grado se procesan antes: cubren más caminos y
+        # las etiquetas salen más pequeñas. El rango hace de identificador.
+        grado: Dict[str, int] = {n: len(vecinos) for n, vecinos in grafo.adyacencia.items()}
+        for vecinos in grafo.adyacencia.values():
+            for v in vecinos:
+                grado[v] += 1
+        self.orden: List[str] = sorted(grafo.nodos, key=lambda n: (-grado[n], n))
+        self.rango: Dict[str, int] = {n: i for i, n in enumerate(self.orden)}
+
+        n = len(self.orden)
+        # etiquetas por rango: hubs (rangos crecientes) y distancias paralelas
+        self._salida_hubs = [array("l") for _ in range(n)]
+        self._salida_dist = [array("d") for _ in range(n)]
+        self._entrada_hubs = [array("l") for _ in range(n)]
+        self._entrada_dist = [array("d") for _ in range(n)]
+
+        directa = [
+            [(self.rango[v], p) for v, p in grafo.vecinos(nombre)]
+            for nombre in self.orden
+        ]
+        inversa: List[list] = [[] for _ in range(n)]
+        for u, vecinos in enumerate(directa):
+            for v, p in vecinos:
+                inversa[v].append((u, p))
+
+        for hub in range(n):
+            # hacia delante: distancias hub → u, van a la etiqueta de entrada de u
+            self._busqueda_podada(
+                hub, directa,
+                self._salida_hubs, self._salida_dist,
+                self._entrada_hubs, self._entrada_dist,
+            )
+            # hacia atrás: distancias u → hub, van a la etiqueta de salida de u
+            self._busqueda_podada(
+                hub, inversa,
+                self._entrada_hubs, self._entrada_dist,
+                self._salida_hubs, self._salida_dist,
+            )
+
+        self.tiempo_construccion = time.perf_counter() - inicio
+
+    def _busqueda_podada(self, hub, adyacencia, propias_hubs, propias_dist, hubs, dists) -> None:
+        # Etiqueta del hub en el sentido contrario, indexada por hub para
+        # consultar en O(|etiqueta de u|) si la distancia ya está cubierta
+        cubierta = dict(zip(propias_hubs[hub], propias_dist[hub]))
+        dist = {hub: 0.0}
+        cola = [(0.0, hub)]
+        while cola:
+            d, u = heapq.heappop(cola)
+            if d > dist[u]:
+                continue
+            # poda: algún hub anterior ya da una distancia igual o mejor
+            if any(
+                h in cubierta and cubierta[h] + dh <= d
+                for h, dh in zip(hubs[u], dists[u])
+            ):
+                continue
+            hubs[u].append(hub)
+            dists[u].append(d)
+            for v, p in adyacencia[u]:
+                alt = d + p
+                if alt < dist.get(v, math.inf):
+                    dist[v] = alt
+                    heapq.heappush(cola, (alt, v))
+
+    # ---------- consultas -------------------------------------------
+    def vigente(self) -> bool:
+        """Indica si el grafo no ha cambiado desde que se construyeron las etiquetas."""
+        return self.grafo.version == self.version
+
+    def distancia(self, origen: str, destino: str) -> float:
+        """Distancia mínima de ``origen`` a ``destino`` (``math.inf`` si no hay ruta)."""
+        u, v = self._rango(origen), self._rango(destino)
+        hubs_u, dist_u = self._salida_hubs[u], self._salida_dist[u]
+        hubs_v, dist_v = self._entrada_hubs[v], self._entrada_dist[v]
+
+        # Mezcla de dos listas ordenadas por rango de hub
+        mejor = math.inf
+        i = j = 0
+        while i < len(hubs_u) and j < len(hubs_v):
+            if hubs_u[i] == hubs_v[j]:
+                total = dist_u[i] + dist_v[j]
+                if total < mejor:
+                    mejor = total
+                i += 1
+                j += 1
+            elif hubs_u[i] < hubs_v[j]:
+                i += 1
+            else:
+                j += 1
+        return mejor
+
+    def matriz(self, origenes: List[str], destinos: List[str]) -> List[List[float]]:
+        """
+        Matriz de distancias ``origenes × destinos``.
+
+        La etiqueta de entrada de cada destino se indexa una sola vez, así que
+        cada celda cuesta un recorrido de la etiqueta de salida del origen.
+        """
+        columnas = []
+        for destino in destinos:
+            v = self._rango(destino)
+            columnas.append(dict(zip(self._entrada_hubs[v], self._entrada_dist[v])))
+
+        resultado = []
+        for origen in origenes:
+            u = self._rango(origen)
+            salida = list(zip(self._salida_hubs[u], self._salida_dist[u]))
+            fila = []
+            for entrada in columnas:
+                mejor = math.inf
+                for h, d in salida:
+                    dv = entrada.get(h)
+                    if dv is not None and d + dv < mejor:
+                        mejor = d + dv
+                fila.append(mejor)
+            resultado.append(fila)
+        return resultado
+
+    def estadisticas(self) -> Dict[str, float]:
+        """Tamaño de las etiquetas y tiempo de construcción."""
+        entradas = [
+            len(self._salida_hubs[i]) + len(self._entrada_hubs[i])
+            for i in range(len(self.orden))
+        ]
+        total = sum(entradas)
+        bytes_etiquetas = sum(
+            a.itemsize * len(a)
+            for arrays in (self._salida_hubs, self._salida_dist, self._entrada_hubs, self._entrada_dist)
+            for a in arrays
+        )
+        return {
+            "nodos": len(self.orden),
+            "entradas": total,
+            "entradas_por_nodo": total / len(entradas) if entradas else 0.0,
+            "max_entradas": max(entradas, default=0),
+            "bytes": bytes_etiquetas,
+            "segundos_construccion": self.tiempo_construccion,
+        }
+
+    def _rango(self, nombre: str) -> int:
+        if nombre not in self.rango:
+            raise KeyError(f"No existe el nodo «{nombre}».")
+        return self.rango[nombre]
@@ -0,0 +1,198 @@
+"""
+Exportación del grafo y de rutas calculadas a GeoJSON y CSV.
+
+Los exportadores escriben elemento a elemento directamente desde el modelo,
+sin construir antes un diccionario con todo el grafo, así que la memoria no
+crece con el tamaño del mapa. Si la ruta del archivo termina en ``.gz`` (o
+se pasa ``comprimir=True``) la salida se comprime con gzip.
+
+Las coordenadas siguen el orden de GeoJSON: (longitud, latitud) en grados.
+"""
+
+import csv
+import gzip
+import json
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from modelo.grafo import Grafo
+
+# Una ruta a exportar: (nombre, nodos del camino en orden)
+Ruta = Tuple[str, List[str]]
+
+COLUMNAS_CSV = ("tipo", "nombre", "origen", "destino", "peso", "bidireccional", "wkt")
+
+
+def _abrir(ruta: str, comprimir: Optional[bool]):
+    if comprimir is None:
+        comprimir = ruta.endswith(".gz")
+    if comprimir:
+        return gzip.open(ruta, "wt", encoding="utf-8", newline="")
+    return open(ruta, "w", encoding="utf-8", newline="")
+
+
+# ---------- simplificación ----------------------------------------------
+def simplificar(puntos: Sequence[Tuple[float, float]], tolerancia: float) -> List[Tuple[float, float]]:
+    """
+    Simplifica una polilínea con Douglas–Peucker.
+
+    Se conservan los extremos y todo punto que se separe más de
+    ``tolerancia`` (en grados) del segmento que lo sustituiría. La versión es
+    iterativa, así que no hay límite de recursión con rutas muy largas.
+    """
+    if tolerancia <= 0 or len(puntos) < 3:
+        return list(puntos)
+    conservar = [False] * len(puntos)
+    conservar[0] = conservar[-1] = True
+    pendientes = [(0, len(puntos) - 1)]
+    while pendientes:
+        i, j = pendientes.pop()
+        peor, indice = tolerancia, None
+        for k in range(i + 1, j):
+            d = _distancia_a_segmento(puntos[k], puntos[i], puntos[j])
+            if d > peor:
+                peor, indice = d, k
+        if indice is not None:
+            conservar[indice] = True
+            pendientes.append((i, indice))
+            pendientes.append((indice, j))
+    return [p for p, c in zip(puntos, conservar) if c]
+
+
+def _distancia_a_segmento(p, a, b) -> float:
+    (x, y), (x1, y1), (x2, y2) = p, a, b
+    dx, dy = x2 - x1, y2 - y1
+    largo = dx * dx + dy * dy
+    if largo == 0:
+        return math.hypot(x - x1, y - y1)
+    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / largo))
+    return math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+
+
+# ---------- elementos ---------------------------------------------------
+def elementos(grafo: Grafo, rutas: Iterable[Ruta] = (), tolerancia: float = 0.0) -> Iterator[Dict]:
+    """
+    Genera, uno a uno, los elementos GeoJSON de los nodos, las aristas y las
+    ``rutas`` indicadas. Las rutas se simplifican con ``tolerancia``; las
+    aristas son segmentos y no se simplifican. Una ruta de un solo nodo se
+    exporta como punto.
+    """
+    for nombre, nodo in grafo.nodos.items():
+        yield {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [nodo.longitud, nodo.latitud]},
+            "properties": {"tipo": "nodo", "nombre": nombre},
+        }
+    for a in grafo.aristas:
+        o, d = grafo.nodos[a.origen], grafo.nodos[a.destino]
+        yield {
+            "type": "Feature",
+            "geometry": {
+                "type": "LineString",
+                "coordinates": [[o.longitud, o.latitud], [d.longitud, d.latitud]],
+            },
+            "properties": {
+                "tipo": "arista",
+                "origen": a.origen,
+                "destino": a.destino,
+                "peso": a.peso,
+                "bidireccional": a.bidireccional,
+            },
+        }
+    for nombre, camino in rutas:
+        if not camino:
+            continue
+        puntos = [(grafo.nodos[n].longitud, grafo.nodos[n].latitud) for n in camino]
+        distancia = sum(grafo.peso(a, b) for a, b in zip(camino, camino[1:]))
+        if len(camino) == 1:
+            # p. ej. un vehículo sin paradas que empieza y acaba en el mismo
+            # nodo: una LineString necesita al menos dos posiciones
+            geometria = {"type": "Point", "coordinates": list(puntos[0])}
+        else:
+            geometria = {
+                "type": "LineString",
+                "coordinates": [list(p) for p in simplificar(puntos, tolerancia)],
+            }
+        yield {
+            "type": "Feature",
+            "geometry": geometria,
+            "properties": {
+                "tipo": "ruta",
+                "nombre": nombre,
+                "origen": camino[0],
+                "destino": camino[-1],
+                "peso": distancia,
+                "nodos": len(camino),
+            },
+        }
+
+
+# ---------- escritores --------------------------------------------------
+def exportar_geojson(
+    grafo: Grafo,
+    ruta: str,
+    rutas: Iterable[Ruta] = (),
+    tolerancia: float = 0.0,
+    comprimir: Optional[bool] = None,
+) -> int:
+    """Escribe una FeatureCollection en ``ruta``. Devuelve el número de elementos."""
+    total = 0
+    with _abrir(ruta, comprimir) as f:
+        f.write('{"type": "FeatureCollection", "features": [\n')
+        for elemento in elementos(grafo, rutas, tolerancia):
+            if total:
+                f.write(",\n")
+            f.write(json.dumps(elemento, ensure_ascii=False))
+            total += 1
+        f.write("\n]}\n")
+    return total
+
+
+def exportar_csv(
+    grafo: Grafo,
+    ruta: str,
+    rutas: Iterable[Ruta] = (),
+    tolerancia: float = 0.0,
+    comprimir: Optional[bool] = None,
+) -> int:
+    """
+    Escribe un CSV con una fila por elemento y la geometría en WKT (columna
+    ``wkt``), que QGIS y GDAL leen directamente. Devuelve el número de filas.
+    """
+    total = 0
+    with _abrir(ruta, comprimir) as f:
+        escritor = csv.writer(f)
+        escritor.writerow(COLUMNAS_CSV)
+        for elemento in elementos(grafo, rutas, tolerancia):
+            p = elemento["properties"]
+            escritor.writerow((
+                p["tipo"],
+                p.get("nombre", ""),
+                p.get("origen", ""),
+                p.get("destino", ""),
+                p.get("peso", ""),
+                p.get("bidireccional", ""),
+                _wkt(elemento["geometry"]),
+            ))
+            total += 1
+    return total
+
+
+def _wkt(geometria: Dict) -> str:
+    if geometria["type"] == "Point":
+        x, y = geometria["coordinates"]
+        return f"POINT ({x!r} {y!r})"
+    return "LINESTRING (" + ", ".join(f"{x!r} {y!r}" for x, y in geometria["coordinates"]) + ")"
+
+
+def exportar(
+    grafo: Grafo,
+    ruta: str,
+    rutas: Iterable[Ruta] = (),
+    tolerancia: float = 0.0,
+) -> int:
+    """Elige el formato por la extensión: ``.csv`` o GeoJSON (con ``.gz`` opcional)."""
+    base = ruta[:-3] if ruta.endswith(".gz") else ruta
+    if base.lower().endswith(".csv"):
+        return exportar_csv(grafo, ruta, rutas, tolerancia)
+    return exportar_geojson(grafo, ruta, rutas, tolerancia)
@@ -0,0 +1,247 @@
+"""
+Reparto de paradas entre varios vehículos (VRP con capacidades opcionales).
+
+El solucionador trabaja sólo con una matriz de costes entre índices, así que
+no depende del grafo y se puede ejecutar en procesos aparte. Cada proceso
+repite, hasta agotar el tiempo, una construcción aleatorizada por inserción
+más barata seguida de búsqueda local (relocate, exchange y 2-opt* entre
+rutas); al final se queda la mejor solución de todos los procesos.
+"""
+
+import math
+import os
+import random
+import time
+from typing import List, Optional, Sequence, Tuple
+
+
+class Vehiculo:
+    def __init__(self, inicio: str, fin: str, capacidad: Optional[float] = None) -> None:
+        self.inicio = inicio
+        self.fin = fin
+        self.capacidad = capacidad
+
+
+# Un vehículo para el solucionador: (índice de inicio, índice de fin, capacidad)
+VehiculoIdx = Tuple[int, int, float]
+
+
+def resolver(
+    matriz: Sequence[Sequence[float]],
+    vehiculos: List[VehiculoIdx],
+    paradas: List[int],
+    demandas: List[float],
+    tiempo: float = 2.0,
+    procesos: Optional[int] = None,
+    semilla: int = 0,
+) -> Tuple[List[List[int]], float]:
+    """
+    Reparte ``paradas`` (índices de ``matriz``) entre ``vehiculos``.
+
+    ``demandas[k]`` es la carga de ``paradas[k]``; la capacidad de un
+    vehículo sin límite es ``math.inf``. Devuelve, por vehículo, la lista
+    ordenada de paradas que visita y el coste total.
+    """
+    for k, (inicio, fin, _) in enumerate(vehiculos):
+        if not matriz[inicio][fin] < math.inf:
+            raise ValueError(f"El vehículo {k + 1} no puede llegar desde su inicio hasta su fin.")
+    if sum(demandas) > sum(c for _, _, c in vehiculos):
+        raise ValueError("La capacidad total de la flota no alcanza para todas las paradas.")
+    for p in paradas:
+        if not any(matriz[i][p] < math.inf and matriz[p][f] < math.inf for i, f, _ in vehiculos):
+            raise ValueError("Hay paradas que ningún vehículo puede alcanzar.")
+
+    procesos = procesos or os.cpu_count() or 1
+    argumentos = [
+        (matriz, vehiculos, paradas, demandas, tiempo, semilla + i) for i in range(procesos)
+    ]
+    if procesos == 1:
+        resultados = [_buscar(argumentos[0])]
+    else:
+        # se importa aquí: concurrent.futures alarga el arranque de la aplicación
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            resultados = list(ejecutor.map(_buscar, argumentos))
+
+    resultados = [r for r in resultados if r is not None]
+    if not resultados:
+        raise ValueError("No se encontró un reparto que respete las capacidades.")
+    return min(resultados, key=lambda r: r[1])
+
+
+def _buscar(argumentos) -> Optional[Tuple[List[List[int]], float]]:
+    matriz, vehiculos, paradas, demandas, tiempo, semilla = argumentos
+    azar = random.Random(semilla)
+    limite = time.monotonic() + tiempo
+    busqueda = _Busqueda(matriz, vehiculos, dict(zip(paradas, demandas)))
+
+    mejor = None
+    primera = True
+    # Al menos una iteración aunque el tiempo sea muy corto
+    while primera or time.monotonic() < limite:
+        primera = False
+        orden = list(paradas)
+        azar.shuffle(orden)
+        rutas = busqueda.construir(orden)
+        if rutas is None:
+            continue
+        busqueda.mejorar(rutas, limite)
+        coste = busqueda.coste_total(rutas)
+        if mejor is None or coste < mejor[1]:
+            mejor = ([list(r) for r in rutas], coste)
+    return mejor
+
+
+class _Busqueda:
+    def __init__(self, matriz, vehiculos: List[VehiculoIdx], demanda: dict) -> None:
+        self.d = matriz
+        self.vehiculos = vehiculos
+        self.demanda = demanda
+
+    # ---------- costes ----------------------------------------------
+    def coste_ruta(self, v: int, ruta: List[int]) -> float:
+        inicio, fin, _ = self.vehiculos[v]
+        secuencia = [inicio] + ruta + [fin]
+        return sum(self.d[a][b] for a, b in zip(secuencia, secuencia[1:]))
+
+    def coste_total(self, rutas: List[List[int]]) -> float:
+        return sum(self.coste_ruta(v, r) for v, r in enumerate(rutas))
+
+    def carga(self, ruta: List[int]) -> float:
+        return sum(self.demanda[p] for p in ruta)
+
+    def _anterior(self, v: int, ruta: List[int], i: int) -> int:
+        return ruta[i - 1] if i > 0 else self.vehiculos[v][0]
+
+    def _siguiente(self, v: int, ruta: List[int], i: int) -> int:
+        return ruta[i] if i < len(ruta) else self.vehiculos[v][1]
+
+    # ---------- construcción ----------------------------------------
+    def construir(self, orden: List[int]) -> Optional[List[List[int]]]:
+        """Inserción más barata respetando capacidades."""
+        rutas: List[List[int]] = [[] for _ in self.vehiculos]
+        cargas = [0.0] * len(self.vehiculos)
+        for p in orden:
+            mejor = None
+            for v, ruta in enumerate(rutas):
+                if cargas[v] + self.demanda[p] > self.vehiculos[v][2]:
+                    continue
+                for i in range(len(ruta) + 1):
+                    a, b = self._anterior(v, ruta, i), self._siguiente(v, ruta, i)
+                    delta = self.d[a][p] + self.d[p][b] - self.d[a][b]
+                    if not delta < math.inf:
+                        continue  # tramo sin ruta (o inf - inf)
+                    if mejor is None or delta < mejor[0]:
+                        mejor = (delta, v, i)
+            if mejor is None:
+                return None
+            _, v, i = mejor
+            rutas[v].insert(i, p)
+            cargas[v] += self.demanda[p]
+        return rutas
+
+    # ---------- búsqueda local --------------------------------------
+    def mejorar(self, rutas: List[List[int]], limite: float) -> None:
+        """Aplica movimientos de mejora hasta un óptimo local o el límite de tiempo."""
+        mejora = True
+        while mejora and time.monotonic() < limite:
+            mejora = (
+                self._relocate(rutas)
+                or self._exchange(rutas)
+                or self._dos_opt_estrella(rutas)
+            )
+
+    def _relocate(self, rutas: List[List[int]]) -> bool:
+        cargas = [self.carga(r) for r in rutas]
+        for v1, r1 in enumerate(rutas):
+            for i, p in enumerate(r1):
+                a, b = self._anterior(v1, r1, i), self._siguiente(v1, r1, i + 1)
+                ahorro = self.d[a][p] + self.d[p][b] - self.d[a][b]
+                for v2, r2 in enumerate(rutas):
+                    if v2 != v1 and cargas[v2] + self.demanda[p] > self.vehiculos[v2][2]:
+                        continue
+                    # en la misma ruta se trabaja sobre la ruta sin p
+                    destino = r1[:i] + r1[i + 1:] if v2 == v1 else r2
+                    for j in range(len(destino) + 1):
+                        if v2 == v1 and j == i:
+                            continue
+                        x, y = self._anterior(v2, destino, j), self._siguiente(v2, destino, j)
+                        coste = self.d[x][p] + self.d[p][y] - self.d[x][y]
+                        if coste < ahorro - 1e-9:
+                            del r1[i]
+                            rutas[v2].insert(j, p)
+                            return True
+        return False
+
+    def _exchange(self, rutas: List[List[int]]) -> bool:
+        cargas = [self.carga(r) for r in rutas]
+        for v1, r1 in enumerate(rutas):
+            for v2 in range(v1 + 1, len(rutas)):
+                r2 = rutas[v2]
+                for i, p in enumerate(r1):
+                    a, b = self._anterior(v1, r1, i), self._siguiente(v1, r1, i + 1)
+                    for j, q in enumerate(r2):
+                        dp, dq = self.demanda[p], self.demanda[q]
+                        if (cargas[v1] - dp + dq > self.vehiculos[v1][2]
+                                or cargas[v2] - dq + dp > self.vehiculos[v2][2]):
+                            continue
+                        x, y = self._anterior(v2, r2, j), self._siguiente(v2, r2, j + 1)
+                        delta = (
+                            self.d[a][q] + self.d[q][b] - self.d[a][p] - self.d[p][b]
+                            + self.d[x][p] + self.d[p][y] - self.d[x][q] - self.d[q][y]
+                        )
+                        if delta < -1e-9:
+                            r1[i], r2[j] = q, p
+                            return True
+        return False
+
+    def _dos_opt_estrella(self, rutas: List[List[int]]) -> bool:
+        # Intercambia las colas de dos rutas; cada vehículo conserva su fin.
+        # Con costes acumulados cada candidato se evalúa en O(1).
+        prefijos = [self._prefijos(v, r) for v, r in enumerate(rutas)]
+        cargas = [self._cargas_acumuladas(r) for r in rutas]
+        for v1, r1 in enumerate(rutas):
+            for v2 in range(v1 + 1, len(rutas)):
+                r2 = rutas[v2]
+                actual = prefijos[v1][-1] + prefijos[v2][-1]
+                for i in range(len(r1) + 1):
+                    for j in range(len(r2) + 1):
+                        if (cargas[v1][i] + cargas[v2][-1] - cargas[v2][j] > self.vehiculos[v1][2]
+                                or cargas[v2][j] + cargas[v1][-1] - cargas[v1][i] > self.vehiculos[v2][2]):
+                            continue
+                        nuevo = (
+                            self._coste_union(v1, r1, prefijos[v1], i, r2, prefijos[v2], j)
+                            + self._coste_union(v2, r2, prefijos[v2], j, r1, prefijos[v1], i)
+                        )
+                        if nuevo < actual - 1e-9:
+                            rutas[v1], rutas[v2] = r1[:i] + r2[j:], r2[:j] + r1[i:]
+                            return True
+        return False
+
+    def _prefijos(self, v: int, ruta: List[int]) -> List[float]:
+        # P[k]: coste de inicio → ruta[0] → … → ruta[k-1]; el último incluye el fin
+        inicio, fin, _ = self.vehiculos[v]
+        prefijos = [0.0]
+        anterior = inicio
+        for p in ruta:
+            prefijos.append(prefijos[-1] + self.d[anterior][p])
+            anterior = p
+        prefijos.append(prefijos[-1] + self.d[anterior][fin])
+        return prefijos
+
+    def _cargas_acumuladas(self, ruta: List[int]) -> List[float]:
+        cargas = [0.0]
+        for p in ruta:
+            cargas.append(cargas[-1] + self.demanda[p])
+        return cargas
+
+    def _coste_union(self, v, propia, prefijos_propia, i, ajena, prefijos_ajena, j) -> float:
+        """Coste de ``inicio(v) + propia[:i] + ajena[j:] + fin(v)``."""
+        ultimo = self._anterior(v, propia, i)
+        fin = self.vehiculos[v][1]
+        if j == len(ajena):
+            return prefijos_propia[i] + self.d[ultimo][fin]
+        # coste interno de ajena[j:], sin su tramo inicial ni su tramo final
+        interno = prefijos_ajena[len(ajena)] - prefijos_ajena[j + 1]
+        return prefijos_propia[i] + self.d[ultimo][ajena[j]] + interno + self.d[ajena[-1]][fin]
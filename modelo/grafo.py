@@ -1,71 +1,372 @@
 import math
 import heapq
-from typing import Optional, Tuple, List, Dict
+import sys
+from array import array
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Optional, Tuple, List, Dict, Set, Callable, Iterator
+
+from modelo import metricas
+from modelo.almacen import AlmacenAristas, AlmacenNodos
+from modelo.indice import IndiceNombres
 
 
 class Nodo:
+    """
+    Vista de un nodo guardado en un ``AlmacenNodos``: leer o asignar sus
+    atributos lee o escribe directamente en los arrays del almacén. Una vista
+    sólo es válida mientras el nodo exista.
+    """
+
+    __slots__ = ("_almacen", "_id")
+
     def __init__(self, nombre: str, latitud: float, longitud: float) -> None:
-        self.nombre = nombre
-        self.latitud = latitud
-        self.longitud = longitud
-
-    # distancia euclídea (suficiente para la demo; cambia a Haversine si usas coords reales)
-    def distancia(self, otro: "Nodo") -> float:
-        return math.sqrt(
-            (self.latitud - otro.latitud) ** 2 + (self.longitud - otro.longitud) ** 2
+        # nodo suelto, fuera de un grafo: con su propio almacén
+        self._almacen = AlmacenNodos()
+        self._id = self._almacen.agregar(nombre, latitud, longitud)
+
+    @classmethod
+    def _vista(cls, almacen: AlmacenNodos, id: int) -> "Nodo":
+        nodo = cls.__new__(cls)
+        nodo._almacen = almacen
+        nodo._id = id
+        return nodo
+
+    @property
+    def nombre(self) -> str:
+        return self._almacen.nombres[self._id]
+
+    @property
+    def latitud(self) -> float:
+        return self._almacen.latitudes[self._id]
+
+    @latitud.setter
+    def latitud(self, valor: float) -> None:
+        self._almacen.latitudes[self._id] = valor
+
+    @property
+    def longitud(self) -> float:
+        return self._almacen.longitudes[self._id]
+
+    @longitud.setter
+    def longitud(self, valor: float) -> None:
+        self._almacen.longitudes[self._id] = valor
+
+    # por defecto euclídea sobre grados; ver modelo.metricas para Haversine
+    def distancia(self, otro: "Nodo", metrica: str = "euclidea") -> float:
+        return metricas.distancia(
+            metrica, self.latitud, self.longitud, otro.latitud, otro.longitud
         )
 
 
 class Arista:
+    """
+    Arista de un grafo. El peso no se guarda en el objeto sino en el array
+    de pesos del grafo (``AlmacenAristas``), el mismo al que apunta la
+    adyacencia.
+    """
+
+    __slots__ = ("origen", "destino", "bidireccional", "_pesos", "_id")
+
     def __init__(self, origen: str, destino: str, peso: float, bidireccional: bool = True) -> None:
+        # arista suelta, fuera de un grafo: con su propio array de pesos
         self.origen = origen
         self.destino = destino
-        self.peso = peso
         self.bidireccional = bidireccional
+        self._pesos = array("d", [peso])
+        self._id = 0
 
+    @classmethod
+    def _vista(cls, origen: str, destino: str, bidireccional: bool, pesos: array, id: int) -> "Arista":
+        arista = cls.__new__(cls)
+        arista.origen = origen
+        arista.destino = destino
+        arista.bidireccional = bidireccional
+        arista._pesos = pesos
+        arista._id = id
+        return arista
+
+    @property
+    def peso(self) -> float:
+        return self._pesos[self._id]
+
+    @peso.setter
+    def peso(self, valor: float) -> None:
+        self._pesos[self._id] = valor
+
+
+class _Nodos(Mapping):
+    """``Grafo.nodos``: nombre → vista ``Nodo`` sobre el almacén del grafo."""
+
+    __slots__ = ("_almacen",)
+
+    def __init__(self, almacen: AlmacenNodos) -> None:
+        self._almacen = almacen
+
+    def __getitem__(self, nombre: str) -> Nodo:
+        return Nodo._vista(self._almacen, self._almacen.ids[nombre])
+
+    def __contains__(self, nombre) -> bool:
+        return nombre in self._almacen.ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._almacen.ids)
+
+    def __len__(self) -> int:
+        return len(self._almacen.ids)
+
+
+class Cambios:
+    """
+    Conjunto de cambios que un grafo notifica a sus observadores.
+
+    Las aristas se identifican por el par (origen, destino). Los cambios se
+    normalizan: un nodo agregado y eliminado dentro del mismo lote no aparece.
+    """
 
-class Grafo:
     def __init__(self) -> None:
-        # nombre → Nodo
-        self.nodos: Dict[str, Nodo] = {}
-        # nombre → {vecino: peso}
-        self.adyacencia: Dict[str, Dict[str, float]] = {}
+        self.nodos_agregados: Set[str] = set()
+        self.nodos_editados: Set[str] = set()
+        self.nodos_eliminados: Set[str] = set()
+        self.aristas_agregadas: Set[Tuple[str, str]] = set()
+        self.aristas_eliminadas: Set[Tuple[str, str]] = set()
+        # aristas cuyo peso se recalculó por mover alguno de sus nodos
+        self.aristas_actualizadas: Set[Tuple[str, str]] = set()
+        # (latitud, longitud) antes del lote de los nodos ya existentes que se
+        # movieron o eliminaron; permite saber qué zona del mapa ha cambiado
+        self.posiciones_anteriores: Dict[str, Tuple[float, float]] = {}
+        # operaciones en el orden en que se aplicaron: (método, *argumentos)
+        self.operaciones: List[Tuple] = []
+
+    def vacio(self) -> bool:
+        return not (
+            self.operaciones
+            or self.nodos_agregados or self.nodos_editados or self.nodos_eliminados
+            or self.aristas_agregadas or self.aristas_eliminadas
+            or self.aristas_actualizadas
+        )
+
+    def _agregar(self, agregados: set, eliminados: set, editados: set, clave) -> None:
+        if clave in eliminados:
+            # eliminado y vuelto a crear: para los observadores es una edición
+            eliminados.discard(clave)
+            editados.add(clave)
+        else:
+            agregados.add(clave)
+
+    def _eliminar(self, agregados: set, eliminados: set, editados: set, clave) -> None:
+        editados.discard(clave)
+        if clave in agregados:
+            agregados.discard(clave)
+        else:
+            eliminados.add(clave)
+
+    def nodo_agregado(self, nombre: str) -> None:
+        self._agregar(self.nodos_agregados, self.nodos_eliminados, self.nodos_editados, nombre)
+
+    def nodo_editado(self, nombre: str) -> None:
+        if nombre not in self.nodos_agregados:
+            self.nodos_editados.add(nombre)
+
+    def posicion_anterior(self, nodo: "Nodo") -> None:
+        if nodo.nombre not in self.nodos_agregados:
+            self.posiciones_anteriores.setdefault(nodo.nombre, (nodo.latitud, nodo.longitud))
+
+    def nodo_eliminado(self, nombre: str) -> None:
+        self._eliminar(self.nodos_agregados, self.nodos_eliminados, self.nodos_editados, nombre)
+
+    def arista_agregada(self, clave: Tuple[str, str]) -> None:
+        self._agregar(self.aristas_agregadas, self.aristas_eliminadas, self.aristas_actualizadas, clave)
+
+    def arista_actualizada(self, clave: Tuple[str, str]) -> None:
+        if clave not in self.aristas_agregadas:
+            self.aristas_actualizadas.add(clave)
+
+    def arista_eliminada(self, clave: Tuple[str, str]) -> None:
+        self._eliminar(self.aristas_agregadas, self.aristas_eliminadas, self.aristas_actualizadas, clave)
+
+
+class Grafo:
+    def __init__(self, metrica: str = "euclidea") -> None:
+        metricas.validar(metrica)
+        # métrica con la que se calculan los pesos (ver modelo.metricas)
+        self.metrica = metrica
+        # nombres y coordenadas de los nodos (estructura de arrays)
+        self._almacen = AlmacenNodos()
+        # nombre → Nodo (vistas sobre el almacén)
+        self.nodos: Mapping = _Nodos(self._almacen)
+        # extremos y pesos de las aristas (estructura de arrays)
+        self._almacen_aristas = AlmacenAristas()
+        # nombre → {vecino: id de arista}; el peso es ``_almacen_aristas.pesos[id]``
+        # (ver ``peso`` y ``vecinos``)
+        self.adyacencia: Dict[str, Dict[str, int]] = {}
         # Lista de aristas para mantener el registro de conexiones
         self.aristas: List[Arista] = []
+        # Índice de nombres para búsquedas por prefijo/trigramas
+        self.indice = IndiceNombres(self._almacen)
+        # Se incrementa con cada modificación; permite invalidar cachés externas
+        self.version = 0
+        self._inversa: Optional[Dict[str, Dict[str, int]]] = None
+        self._version_inversa = -1
+        self._lat_max = 0.0
+        self._version_lat_max = -1
+        # Observadores y estado del lote en curso
+        self._observadores: List[Callable[[Cambios], None]] = []
+        self._profundidad_lote = 0
+        self._cambios = Cambios()
+        self._movidos: Set[str] = set()
+
+    # ---------- Observadores y lotes -------------------------------
+    def suscribir(self, observador: Callable[[Cambios], None]) -> None:
+        """
+        Registra una función que recibirá un ``Cambios`` al cerrar cada lote.
+        Si un observador lanza una excepción, los demás se llaman igualmente
+        y la primera excepción se propaga después.
+        """
+        self._observadores.append(observador)
+
+    def desuscribir(self, observador: Callable[[Cambios], None]) -> None:
+        if observador in self._observadores:
+            self._observadores.remove(observador)
+
+    @contextmanager
+    def lote(self) -> Iterator["Grafo"]:
+        """
+        Agrupa varias modificaciones::
+
+            with grafo.lote():
+                grafo.agregar_nodo(...)
+                grafo.editar_nodo(...)
+
+        Los pesos de las aristas afectadas por nodos movidos se recalculan
+        una sola vez al salir y los observadores reciben un único ``Cambios``.
+        Los lotes pueden anidarse; sólo cierra el más externo. Si el bloque
+        lanza una excepción, las modificaciones ya hechas se conservan y se
+        notifican igualmente antes de propagarla.
+        """
+        self._profundidad_lote += 1
+        try:
+            yield self
+        finally:
+            self._profundidad_lote -= 1
+            if self._profundidad_lote == 0:
+                self._cerrar_lote()
+
+    def _cerrar_lote(self) -> None:
+        if self._movidos:
+            self._recalcular_pesos(self._movidos)
+            self._movidos = set()
+
+        cambios, self._cambios = self._cambios, Cambios()
+        if cambios.vacio():
+            return
+        # Los cambios ya están aplicados: todos los observadores deben
+        # recibirlos aunque uno falle (p. ej. la vista antes que el diario)
+        error = None
+        for observador in list(self._observadores):
+            try:
+                observador(cambios)
+            except Exception as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
+
+    def _recalcular_pesos(self, movidos: Set[str]) -> None:
+        # Una única pasada por las aristas para todos los nodos movidos
+        afectadas = [a for a in self.aristas if a.origen in movidos or a.destino in movidos]
+        for arista, peso in zip(afectadas, self._pesos(afectadas)):
+            # la adyacencia apunta al mismo peso: no hay que tocarla
+            arista.peso = peso
+            self._cambios.arista_actualizada((arista.origen, arista.destino))
+
+    def _pesos(self, aristas: List["Arista"]) -> list:
+        """Pesos de ``aristas`` con la métrica actual, calculados en un solo lote."""
+        ids = self._almacen.ids
+        return metricas.distancias_indices(
+            self.metrica, self._almacen.latitudes, self._almacen.longitudes,
+            [ids[a.origen] for a in aristas], [ids[a.destino] for a in aristas],
+        )
+
+    def _distancia(self, origen: str, destino: str) -> float:
+        a = self._almacen
+        o, d = a.ids[origen], a.ids[destino]
+        return metricas.distancia(
+            self.metrica, a.latitudes[o], a.longitudes[o], a.latitudes[d], a.longitudes[d]
+        )
+
+    def cambiar_metrica(self, metrica: str) -> None:
+        """Cambia la métrica y recalcula de una vez los pesos de todas las aristas."""
+        metricas.validar(metrica)
+        if metrica == self.metrica:
+            return
+        with self.lote():
+            self.metrica = metrica
+            # Un único cálculo sobre los arrays de extremos, escrito de una
+            # vez en el array de pesos (los huecos de aristas eliminadas
+            # también se calculan, pero nadie los lee)
+            a = self._almacen_aristas
+            a.pesos[:] = array("d", metricas.distancias_indices(
+                metrica, self._almacen.latitudes, self._almacen.longitudes, a.origenes, a.destinos,
+            ))
+            self.version += 1
+            self._cambios.operaciones.append(("cambiar_metrica", metrica))
 
     # ---------- CRUD de Nodos ----------------------------------------
     def agregar_nodo(self, nombre: str, latitud: float, longitud: float) -> None:
         if nombre in self.nodos:
             raise ValueError(f"El nodo «{nombre}» ya existe.")
 
-        nuevo = Nodo(nombre, latitud, longitud)
-        self.nodos[nombre] = nuevo
-        self.adyacencia[nombre] = {}
+        with self.lote():
+            id = self._almacen.agregar(nombre, latitud, longitud)
+            # a partir de aquí se usa el objeto del almacén, no el recibido
+            nombre = self._almacen.nombres[id]
+            self.adyacencia[nombre] = {}
+            self.indice.agregar(id)
+            self.version += 1
+            self._cambios.nodo_agregado(nombre)
+            self._cambios.operaciones.append(("agregar_nodo", nombre, latitud, longitud))
 
     def editar_nodo(self, nombre: str, latitud: float, longitud: float) -> None:
         if nombre not in self.nodos:
             raise KeyError(f"No existe el nodo «{nombre}».")
 
-        nodo = self.nodos[nombre]
-        nodo.latitud, nodo.longitud = latitud, longitud
+        with self.lote():
+            nodo = self.nodos[nombre]
+            self._cambios.posicion_anterior(nodo)
+            nodo.latitud, nodo.longitud = latitud, longitud
 
-        # Actualiza los pesos de las aristas conectadas
-        for arista in self.aristas:
-            if arista.origen == nombre or arista.destino == nombre:
-                self._actualizar_arista(arista)
+            # Los pesos de las aristas conectadas se actualizan al cerrar el lote
+            self._movidos.add(nombre)
+            self.version += 1
+            self._cambios.nodo_editado(nombre)
+            self._cambios.operaciones.append(("editar_nodo", nombre, latitud, longitud))
 
     def eliminar_nodo(self, nombre: str) -> None:
         if nombre not in self.nodos:
             raise KeyError(f"No existe el nodo «{nombre}».")
 
-        # Elimina todas las aristas conectadas al nodo
-        self.aristas = [a for a in self.aristas 
-                       if a.origen != nombre and a.destino != nombre]
-        
-        del self.nodos[nombre]
-        del self.adyacencia[nombre]
-        for vecinos in self.adyacencia.values():
-            vecinos.pop(nombre, None)
+        with self.lote():
+            # Elimina todas las aristas conectadas al nodo
+            conservadas = []
+            for a in self.aristas:
+                if a.origen != nombre and a.destino != nombre:
+                    conservadas.append(a)
+                else:
+                    self._almacen_aristas.eliminar(a._id)
+                    self._cambios.arista_eliminada((a.origen, a.destino))
+            self.aristas = conservadas
+
+            self._cambios.posicion_anterior(self.nodos[nombre])
+            self.indice.eliminar(self._almacen.ids[nombre])
+            self._almacen.eliminar(nombre)
+            del self.adyacencia[nombre]
+            for vecinos in self.adyacencia.values():
+                vecinos.pop(nombre, None)
+            self._movidos.discard(nombre)
+            self.version += 1
+            self._cambios.nodo_eliminado(nombre)
+            self._cambios.operaciones.append(("eliminar_nodo", nombre))
 
     # ---------- CRUD de Aristas --------------------------------------
     def agregar_arista(self, origen: str, destino: str, bidireccional: bool = True) -> None:
@@ -75,38 +376,57 @@ class Grafo:
         if origen == destino:
             raise ValueError("No se puede conectar un nodo consigo mismo.")
 
-        # Calcula la distancia entre los nodos
-        peso = self.nodos[origen].distancia(self.nodos[destino])
-        
-        # Crea la arista
-        arista = Arista(origen, destino, peso, bidireccional)
-        self.aristas.append(arista)
-        
-        # Actualiza la matriz de adyacencia
-        self.adyacencia[origen][destino] = peso
-        if bidireccional:
-            self.adyacencia[destino][origen] = peso
+        with self.lote():
+            # La arista y la adyacencia comparten los nombres del almacén
+            origen = self._almacen.canonico(origen)
+            destino = self._almacen.canonico(destino)
+
+            # Calcula la distancia entre los nodos
+            peso = self._distancia(origen, destino)
+
+            # Crea la arista
+            ids = self._almacen.ids
+            id = self._almacen_aristas.agregar(ids[origen], ids[destino], peso)
+            arista = Arista._vista(origen, destino, bidireccional, self._almacen_aristas.pesos, id)
+            self.aristas.append(arista)
+
+            # Actualiza la matriz de adyacencia
+            self.adyacencia[origen][destino] = id
+            if bidireccional:
+                self.adyacencia[destino][origen] = id
+            self.version += 1
+            self._cambios.arista_agregada((origen, destino))
+            self._cambios.operaciones.append(("agregar_arista", origen, destino, bidireccional))
 
     def eliminar_arista(self, origen: str, destino: str) -> None:
-        # Encuentra y elimina la arista
-        self.aristas = [a for a in self.aristas 
-                       if not (a.origen == origen and a.destino == destino)]
-        
-        # Actualiza la matriz de adyacencia
-        if destino in self.adyacencia[origen]:
-            del self.adyacencia[origen][destino]
-        if origen in self.adyacencia[destino]:
-            del self.adyacencia[destino][origen]
-
-    def _actualizar_arista(self, arista: Arista) -> None:
-        # Actualiza el peso de la arista basado en las nuevas posiciones
-        peso = self.nodos[arista.origen].distancia(self.nodos[arista.destino])
-        arista.peso = peso
-        
-        # Actualiza la matriz de adyacencia
-        self.adyacencia[arista.origen][arista.destino] = peso
-        if arista.bidireccional:
-            self.adyacencia[arista.destino][arista.origen] = peso
+        with self.lote():
+            # Encuentra y elimina la arista
+            conservadas = []
+            for a in self.aristas:
+                if a.origen == origen and a.destino == destino:
+                    self._almacen_aristas.eliminar(a._id)
+                else:
+                    conservadas.append(a)
+            self.aristas = conservadas
+
+            # Actualiza la matriz de adyacencia
+            if destino in self.adyacencia[origen]:
+                del self.adyacencia[origen][destino]
+            if origen in self.adyacencia[destino]:
+                del self.adyacencia[destino][origen]
+            self.version += 1
+            self._cambios.arista_eliminada((origen, destino))
+            self._cambios.operaciones.append(("eliminar_arista", origen, destino))
+
+    def peso(self, origen: str, destino: str) -> float:
+        """Peso de la arista que va de ``origen`` a ``destino`` en la adyacencia."""
+        return self._almacen_aristas.pesos[self.adyacencia[origen][destino]]
+
+    def vecinos(self, nombre: str) -> Iterator[Tuple[str, float]]:
+        """Genera (vecino, peso) por cada arista que sale de ``nombre``."""
+        pesos = self._almacen_aristas.pesos
+        for vecino, id in self.adyacencia[nombre].items():
+            yield vecino, pesos[id]
 
     # ---------- Dijkstra --------------------------------------------
     def dijkstra(self, inicio: str, fin: str) -> Optional[Tuple[List[str], float]]:
@@ -118,6 +438,7 @@ class Grafo:
 
         dist[inicio] = 0
         cola: List[Tuple[float, str]] = [(0, inicio)]
+        pesos = self._almacen_aristas.pesos
 
         while cola:
             d, u = heapq.heappop(cola)
@@ -125,8 +446,8 @@ class Grafo:
                 continue
             if u == fin:  # encontrado el destino
                 break
-            for v, peso in self.adyacencia[u].items():
-                alt = d + peso
+            for v, id in self.adyacencia[u].items():
+                alt = d + pesos[id]
                 if alt < dist[v]:
                     dist[v] = alt
                     previo[v] = u
@@ -143,21 +464,166 @@ class Grafo:
             actual = previo[actual]
         return camino, dist[fin]
 
+    def a_estrella(self, inicio: str, fin: str) -> Optional[Tuple[List[str], float]]:
+        """
+        Como ``dijkstra`` pero guiado hacia ``fin`` con una cota inferior
+        coherente con la métrica del grafo, así que explora menos nodos y
+        devuelve la misma distancia.
+        """
+        if inicio not in self.nodos or fin not in self.nodos:
+            raise KeyError("El nodo de inicio o fin no existe.")
+
+        ids, lats, lons = self._almacen.ids, self._almacen.latitudes, self._almacen.longitudes
+        lat_fin, lon_fin = lats[ids[fin]], lons[ids[fin]]
+        lat_max = self._latitud_maxima() if self.metrica == "equirectangular" else 0.0
+        metrica = self.metrica
+
+        def h(nombre: str) -> float:
+            i = ids[nombre]
+            return metricas.cota_inferior(metrica, lats[i], lons[i], lat_fin, lon_fin, lat_max)
+
+        dist: Dict[str, float] = {inicio: 0}
+        previo: Dict[str, Optional[str]] = {inicio: None}
+        cerrados = set()
+        cola: List[Tuple[float, str]] = [(h(inicio), inicio)]
+        pesos = self._almacen_aristas.pesos
+
+        while cola:
+            _, u = heapq.heappop(cola)
+            if u in cerrados:
+                continue
+            if u == fin:
+                break
+            cerrados.add(u)
+            for v, id in self.adyacencia[u].items():
+                alt = dist[u] + pesos[id]
+                if alt < dist.get(v, math.inf):
+                    dist[v] = alt
+                    previo[v] = u
+                    heapq.heappush(cola, (alt + h(v), v))
+
+        if fin not in dist:
+            return None  # no hay ruta
+
+        camino: List[str] = []
+        actual: Optional[str] = fin
+        while actual is not None:
+            camino.insert(0, actual)
+            actual = previo[actual]
+        return camino, dist[fin]
+
+    def _latitud_maxima(self) -> float:
+        # Cacheada por versión: sólo cambia al mover, crear o borrar nodos
+        if self._version_lat_max != self.version:
+            lats = self._almacen.latitudes
+            self._lat_max = max((abs(lats[i]) for i in self._almacen.ids.values()), default=0.0)
+            self._version_lat_max = self.version
+        return self._lat_max
+
+    def dijkstra_a_varios(
+        self, inicio: str, destinos: List[str], inverso: bool = False
+    ) -> Dict[str, Tuple[List[str], float]]:
+        """
+        Dijkstra de un origen a varios destinos en una sola búsqueda.
+
+        Se detiene en cuanto todos los destinos quedan fijados. Con
+        ``inverso=True`` recorre las aristas al revés, de modo que obtiene los
+        caminos *desde* cada destino *hasta* ``inicio`` (ya en el sentido
+        original). Los destinos inalcanzables no aparecen en el resultado.
+        """
+        if inicio not in self.nodos:
+            raise KeyError(f"No existe el nodo «{inicio}».")
+
+        adyacencia = self._adyacencia_inversa() if inverso else self.adyacencia
+        pesos = self._almacen_aristas.pesos
+        pendientes = set(destinos)
+        dist: Dict[str, float] = {inicio: 0}
+        previo: Dict[str, Optional[str]] = {inicio: None}
+        fijados = set()
+        cola: List[Tuple[float, str]] = [(0, inicio)]
+
+        while cola and pendientes:
+            d, u = heapq.heappop(cola)
+            if u in fijados:
+                continue
+            fijados.add(u)
+            pendientes.discard(u)
+            for v, id in adyacencia[u].items():
+                alt = d + pesos[id]
+                if alt < dist.get(v, math.inf):
+                    dist[v] = alt
+                    previo[v] = u
+                    heapq.heappush(cola, (alt, v))
+
+        resultado: Dict[str, Tuple[List[str], float]] = {}
+        for destino in destinos:
+            if destino not in fijados:
+                continue
+            camino: List[str] = []
+            actual: Optional[str] = destino
+            while actual is not None:
+                camino.append(actual)
+                actual = previo[actual]
+            if not inverso:
+                camino.reverse()
+            resultado[destino] = (camino, dist[destino])
+        return resultado
+
+    def _adyacencia_inversa(self) -> Dict[str, Dict[str, int]]:
+        # Se reconstruye sólo cuando el grafo ha cambiado desde la última vez
+        if self._inversa is None or self._version_inversa != self.version:
+            inversa: Dict[str, Dict[str, int]] = {n: {} for n in self.nodos}
+            for u, vecinos in self.adyacencia.items():
+                for v, id in vecinos.items():
+                    inversa[v][u] = id
+            self._inversa = inversa
+            self._version_inversa = self.version
+        return self._inversa
+
+    def buscar_nodos(self, texto: str, limite: int = 10) -> List[str]:
+        """Nombres de nodos que mejor coinciden con ``texto`` (para autocompletar)."""
+        return self.indice.buscar(texto, limite)
+
     def obtener_aristas(self) -> List[Tuple[str, str, float, bool]]:
         """Retorna una lista de tuplas (origen, destino, peso, bidireccional)"""
         return [(a.origen, a.destino, a.peso, a.bidireccional) for a in self.aristas]
 
+    def informe_memoria(self) -> Dict[str, float]:
+        """
+        Memoria aproximada del grafo por estructura, en bytes, y por nodo y
+        por arista. Cuenta los objetos propios del grafo (no los compartidos,
+        como los enteros pequeños) con ``sys.getsizeof``.
+        """
+        informe: Dict[str, float] = dict(self._almacen.bytes())
+        informe["adyacencia"] = sys.getsizeof(self.adyacencia) + sum(
+            sys.getsizeof(vecinos) for vecinos in self.adyacencia.values()
+        )
+        # el id de cada arista es un entero propio, compartido por la arista y
+        # la adyacencia; extremos y pesos están en los arrays del almacén
+        informe["aristas"] = sys.getsizeof(self.aristas) + self._almacen_aristas.bytes() + sum(
+            sys.getsizeof(a) + (sys.getsizeof(a._id) if a._id > 256 else 0) for a in self.aristas
+        )
+        informe["indice"] = self.indice.bytes()
+        nodos = informe["coordenadas"] + informe["nombres"] + informe["ids"] + informe["indice"]
+        aristas = informe["adyacencia"] + informe["aristas"]
+        informe["total"] = nodos + aristas
+        informe["bytes_por_nodo"] = nodos / len(self._almacen) if len(self._almacen) else 0.0
+        informe["bytes_por_arista"] = aristas / len(self.aristas) if self.aristas else 0.0
+        return informe
+
     # ---------- Serialización --------------------------------------
     def to_dict(self) -> Dict:
         """Convierte el grafo a un diccionario serializable a JSON."""
+        lats, lons = self._almacen.latitudes, self._almacen.longitudes
         return {
+            "metrica": self.metrica,
             "nodos": [
                 {
                     "nombre": nombre,
-                    "lat": nodo.latitud,
-                    "lon": nodo.longitud,
+                    "lat": lats[i],
+                    "lon": lons[i],
                 }
-                for nombre, nodo in self.nodos.items()
+                for nombre, i in self._almacen.ids.items()
             ],
             "aristas": [
                 {
@@ -170,15 +636,63 @@ class Grafo:
         }
 
     @classmethod
-    def from_dict(cls, data: Dict) -> "Grafo":
-        """Crea un grafo a partir de un diccionario con la misma estructura que produce to_dict."""
-        grafo = cls()
-        for nodo in data.get("nodos", []):
-            grafo.agregar_nodo(nodo["nombre"], nodo["lat"], nodo["lon"])
-        for arista in data.get("aristas", []):
-            grafo.agregar_arista(
-                arista["origen"],
-                arista["destino"],
-                arista.get("bidireccional", True),
-            )
+    def from_dict(
+        cls,
+        data: Dict,
+        al_avanzar: Optional[Callable[[str, int, int, list], None]] = None,
+        tamano_bloque: int = 5000,
+    ) -> "Grafo":
+        """
+        Crea un grafo a partir de un diccionario con la misma estructura que produce to_dict.
+
+        Si se indica ``al_avanzar``, se llama tras cada bloque de
+        ``tamano_bloque`` elementos con (fase, hechos, total, bloque), donde
+        la fase es ``"nodos"`` o ``"aristas"`` y ``bloque`` la porción de
+        ``data`` recién agregada. Puede lanzar una excepción para cancelar.
+        """
+        grafo = cls(data.get("metrica", "euclidea"))
+        nodos = data.get("nodos", [])
+        aristas = data.get("aristas", [])
+        # Carga en bloque, sin lote: un grafo recién creado no tiene
+        # observadores, así que acumular un ``Cambios`` con cada nodo y arista
+        # sólo ocuparía memoria. Las comprobaciones son las de agregar_*.
+        almacen, adyacencia = grafo._almacen, grafo.adyacencia
+        almacen_aristas = grafo._almacen_aristas
+        for inicio in range(0, len(nodos), tamano_bloque):
+            bloque = nodos[inicio:inicio + tamano_bloque]
+            for nodo in bloque:
+                nombre = nodo["nombre"]
+                if nombre in almacen:
+                    raise ValueError(f"El nodo «{nombre}» ya existe.")
+                adyacencia[almacen.nombres[almacen.agregar(nombre, nodo["lat"], nodo["lon"])]] = {}
+            grafo.version += 1
+            if al_avanzar is not None:
+                al_avanzar("nodos", inicio + len(bloque), len(nodos), bloque)
+        grafo.indice = IndiceNombres(almacen)
+
+        for inicio in range(0, len(aristas), tamano_bloque):
+            bloque = aristas[inicio:inicio + tamano_bloque]
+            nuevas = []
+            for arista in bloque:
+                origen, destino = arista["origen"], arista["destino"]
+                if origen not in almacen or destino not in almacen:
+                    raise KeyError("El nodo de origen o destino no existe.")
+                if origen == destino:
+                    raise ValueError("No se puede conectar un nodo consigo mismo.")
+                o, d = almacen.ids[origen], almacen.ids[destino]
+                id = almacen_aristas.agregar(o, d, 0.0)
+                nuevas.append(Arista._vista(
+                    almacen.nombres[o], almacen.nombres[d],
+                    arista.get("bidireccional", True), almacen_aristas.pesos, id,
+                ))
+            # los pesos del bloque se calculan de una vez, como en cambiar_metrica
+            for arista, peso in zip(nuevas, grafo._pesos(nuevas)):
+                arista.peso = peso
+                adyacencia[arista.origen][arista.destino] = arista._id
+                if arista.bidireccional:
+                    adyacencia[arista.destino][arista.origen] = arista._id
+            grafo.aristas.extend(nuevas)
+            grafo.version += 1
+            if al_avanzar is not None:
+                al_avanzar("aristas", inicio + len(bloque), len(aristas), bloque)
         return grafo
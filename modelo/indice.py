@@ -0,0 +1,165 @@
+import bisect
+import sys
+import unicodedata
+from array import array
+from typing import Dict, List, Set, Tuple
+
+from modelo.almacen import AlmacenNodos
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes, para que «bogota» encuentre «Bogotá»."""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def trigramas(clave: str) -> Set[str]:
+    relleno = f"  {clave} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def _clave(nombre: str) -> str:
+    clave = normalizar(nombre)
+    # ya normalizado: se reutiliza el objeto del nombre en lugar de una copia
+    return nombre if clave == nombre else clave
+
+
+class IndiceNombres:
+    """
+    Índice de nombres de nodos para autocompletado.
+
+    Mantiene las claves normalizadas ordenadas y agrupadas por longitud
+    (búsqueda por prefijo con bisect, de las más cortas a las más largas) y
+    un índice invertido de trigramas (coincidencias en mitad del nombre o
+    con erratas). Los nodos se guardan por su identificador en
+    el ``AlmacenNodos`` del grafo, en arrays de enteros, y los nombres se
+    leen del almacén. ``Grafo`` lo actualiza en cada alta/baja (la baja,
+    antes de borrar el nodo del almacén).
+    """
+
+    def __init__(self, almacen: AlmacenNodos) -> None:
+        self._almacen = almacen
+        # construcción en bloque con los nodos que ya tenga el almacén
+        claves = {id: _clave(nombre) for nombre, id in almacen.ids.items()}
+        orden = sorted(claves, key=lambda id: (claves[id], almacen.nombres[id]))
+        # longitud → (claves normalizadas ordenadas, id de cada una en paralelo)
+        self._por_longitud: Dict[int, Tuple[List[str], array]] = {}
+        for id in orden:
+            claves_l, ids_l = self._grupo(len(claves[id]))
+            claves_l.append(claves[id])
+            ids_l.append(id)
+        self._total = len(orden)
+        # trigrama → ids (en orden creciente) de los nodos que lo contienen
+        self._trigramas: Dict[str, array] = {}
+        for id in sorted(claves):
+            self._indexar_trigramas(claves[id], id)
+
+    def __len__(self) -> int:
+        return self._total
+
+    def _grupo(self, longitud: int) -> Tuple[List[str], array]:
+        grupo = self._por_longitud.get(longitud)
+        if grupo is None:
+            grupo = self._por_longitud[longitud] = ([], array("i"))
+        return grupo
+
+    def _indexar_trigramas(self, clave: str, id: int) -> None:
+        for t in trigramas(clave):
+            ids = self._trigramas.get(t)
+            if ids is None:
+                ids = self._trigramas[t] = array("i")
+            if not ids or ids[-1] < id:
+                ids.append(id)
+            else:
+                bisect.insort(ids, id)  # id reutilizado
+
+    def agregar(self, id: int) -> None:
+        clave = _clave(self._almacen.nombres[id])
+        claves, ids = self._grupo(len(clave))
+        i = bisect.bisect_right(claves, clave)
+        claves.insert(i, clave)
+        ids.insert(i, id)
+        self._total += 1
+        self._indexar_trigramas(clave, id)
+
+    def eliminar(self, id: int) -> None:
+        clave = normalizar(self._almacen.nombres[id])
+        claves, ids = self._por_longitud.get(len(clave), ([], ()))
+        i = bisect.bisect_left(claves, clave)
+        while i < len(claves) and claves[i] == clave:
+            if ids[i] == id:
+                del claves[i]
+                del ids[i]
+                self._total -= 1
+                if not claves:
+                    del self._por_longitud[len(clave)]
+                break
+            i += 1
+        for t in trigramas(clave):
+            ids = self._trigramas.get(t)
+            if ids is None:
+                continue
+            j = bisect.bisect_left(ids, id)
+            if j < len(ids) and ids[j] == id:
+                del ids[j]
+                if not ids:
+                    del self._trigramas[t]
+
+    def bytes(self) -> int:
+        """Memoria aproximada del índice en bytes (sin contar los nombres, que son del grafo)."""
+        nombres = self._almacen.nombres
+        total = sys.getsizeof(self._por_longitud) + sys.getsizeof(self._trigramas)
+        for claves, ids in self._por_longitud.values():
+            total += sys.getsizeof(claves) + sys.getsizeof(ids)
+            for clave, id in zip(claves, ids):
+                if clave is not nombres[id]:
+                    total += sys.getsizeof(clave)
+        for t, ids in self._trigramas.items():
+            total += sys.getsizeof(t) + sys.getsizeof(ids)
+        return total
+
+    def buscar(self, texto: str, limite: int = 10) -> List[str]:
+        """
+        Devuelve hasta ``limite`` nombres ordenados por relevancia: primero la
+        coincidencia exacta, luego los que empiezan por ``texto`` (los más
+        cortos antes) y por último los que comparten más trigramas con él.
+        """
+        clave = normalizar(texto.strip())
+        if not clave:
+            return []
+        nombres = self._almacen.nombres
+
+        # Prefijos: un tramo contiguo en cada grupo de longitud, de los más
+        # cortos a los más largos, hasta reunir ``limite`` (la coincidencia
+        # exacta, si existe, está en el primer grupo). Al cortar se completan
+        # los empates con la última clave, que no van ordenados por nombre.
+        prefijos = []
+        for longitud in sorted(l for l in self._por_longitud if l >= len(clave)):
+            claves, ids = self._por_longitud[longitud]
+            i = bisect.bisect_left(claves, clave)
+            while i < len(claves) and claves[i].startswith(clave):
+                if len(prefijos) >= limite and claves[i] != prefijos[-1][0]:
+                    break
+                prefijos.append((claves[i], nombres[ids[i]]))
+                i += 1
+            if len(prefijos) >= limite:
+                break
+        prefijos.sort(key=lambda par: (par[0] != clave, len(par[0]), par[0], par[1]))
+        resultado = [nombre for _, nombre in prefijos[:limite]]
+        if len(resultado) >= limite:
+            return resultado
+
+        # Trigramas: cuenta cuántos comparte cada candidato con la búsqueda
+        buscados = trigramas(clave)
+        puntos: Dict[int, int] = {}
+        for t in buscados:
+            for id in self._trigramas.get(t, ()):
+                puntos[id] = puntos.get(id, 0) + 1
+        minimo = max(1, len(buscados) // 2)
+        ya = set(resultado)
+        candidatos = sorted(
+            (-p, len(nombres[id]), nombres[id])
+            for id, p in puntos.items() if p >= minimo and nombres[id] not in ya
+        )
+        resultado.extend(nombre for _, _, nombre in candidatos[:limite - len(resultado)])
+        return resultado
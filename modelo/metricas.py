@@ -0,0 +1,133 @@
+"""
+Métricas de distancia entre coordenadas (latitud, longitud en grados).
+
+- ``euclidea``: distancia en el plano sobre los grados sin proyectar.
+- ``haversine``: distancia de círculo máximo, en kilómetros.
+- ``equirectangular``: aproximación plana local de la anterior, en kilómetros;
+  más barata y muy precisa para tramos cortos.
+
+Cada métrica tiene una versión escalar y un núcleo por lotes que trabaja con
+arrays de NumPy. Si NumPy no está disponible, o el lote es pequeño, el núcleo
+por lotes recurre a la versión escalar. NumPy se importa con el primer lote
+grande, no al importar el módulo, para no alargar el arranque.
+"""
+
+import math
+from typing import List, Sequence
+
+_SIN_CARGAR = object()
+np = _SIN_CARGAR
+
+# por debajo de este tamaño de lote el bucle escalar es más rápido que NumPy
+LOTE_MINIMO_NUMPY = 64
+
+RADIO_TIERRA_KM = 6371.0088
+
+METRICAS = ("euclidea", "haversine", "equirectangular")
+
+
+def validar(metrica: str) -> None:
+    if metrica not in METRICAS:
+        raise ValueError(
+            f"Métrica desconocida «{metrica}». Opciones: {', '.join(METRICAS)}."
+        )
+
+
+# ---------- escalares ---------------------------------------------------
+def distancia(metrica: str, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    if metrica == "euclidea":
+        return math.hypot(lat1 - lat2, lon1 - lon2)
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    if metrica == "haversine":
+        a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+        return 2 * RADIO_TIERRA_KM * math.asin(math.sqrt(min(1.0, a)))
+    if metrica == "equirectangular":
+        x = dl * math.cos((p1 + p2) / 2)
+        return RADIO_TIERRA_KM * math.hypot(x, dp)
+    validar(metrica)  # métrica desconocida: lanza ValueError
+    return math.nan
+
+
+def cota_inferior(
+    metrica: str, lat1: float, lon1: float, lat2: float, lon2: float, lat_max: float
+) -> float:
+    """
+    Estimación admisible y consistente de la distancia por carretera entre
+    dos puntos cuando los pesos se calculan con ``metrica`` (para A*).
+
+    Para las dos primeras métricas la propia distancia cumple la desigualdad
+    triangular. La equirectangular no: su factor ``cos(latitud media)``
+    depende del tramo, así que se usa el coseno de la mayor latitud absoluta
+    del grafo (``lat_max``), que nunca supera al de ningún tramo.
+    """
+    if metrica != "equirectangular":
+        return distancia(metrica, lat1, lon1, lat2, lon2)
+    x = math.radians(lon2 - lon1) * math.cos(math.radians(lat_max))
+    return RADIO_TIERRA_KM * math.hypot(x, math.radians(lat2 - lat1))
+
+
+# ---------- por lotes ---------------------------------------------------
+def _numpy():
+    global np
+    if np is _SIN_CARGAR:
+        try:
+            import numpy
+        except ImportError:  # el modelo sigue funcionando sin NumPy, sólo más lento
+            numpy = None
+        np = numpy
+    return np
+
+
+def distancias(
+    metrica: str,
+    lat1: Sequence[float],
+    lon1: Sequence[float],
+    lat2: Sequence[float],
+    lon2: Sequence[float],
+) -> list:
+    """Distancias elemento a elemento entre dos listas de coordenadas."""
+    validar(metrica)
+    if len(lat1) < LOTE_MINIMO_NUMPY or _numpy() is None:
+        return [distancia(metrica, *c) for c in zip(lat1, lon1, lat2, lon2)]
+
+    lat1 = np.asarray(lat1, dtype=np.float64)
+    lon1 = np.asarray(lon1, dtype=np.float64)
+    lat2 = np.asarray(lat2, dtype=np.float64)
+    lon2 = np.asarray(lon2, dtype=np.float64)
+    if metrica == "euclidea":
+        resultado = np.hypot(lat1 - lat2, lon1 - lon2)
+    else:
+        p1, p2 = np.radians(lat1), np.radians(lat2)
+        dp, dl = p2 - p1, np.radians(lon2 - lon1)
+        if metrica == "haversine":
+            a = np.sin(dp / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+            resultado = 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+        else:
+            resultado = RADIO_TIERRA_KM * np.hypot(dl * np.cos((p1 + p2) / 2), dp)
+    return resultado.tolist()
+
+
+def distancias_indices(
+    metrica: str,
+    latitudes: Sequence[float],
+    longitudes: Sequence[float],
+    origenes: List[int],
+    destinos: List[int],
+) -> list:
+    """
+    Como ``distancias``, pero las coordenadas se toman de dos arrays
+    contiguos (p. ej. ``array('d')``) por índice. Con NumPy los arrays se leen
+    sin copiarlos y la selección por índices se hace de una vez.
+    """
+    if len(origenes) < LOTE_MINIMO_NUMPY or _numpy() is None:
+        return distancias(
+            metrica,
+            [latitudes[i] for i in origenes], [longitudes[i] for i in origenes],
+            [latitudes[i] for i in destinos], [longitudes[i] for i in destinos],
+        )
+    lat = np.frombuffer(latitudes, dtype=np.float64)
+    lon = np.frombuffer(longitudes, dtype=np.float64)
+    o = np.asarray(origenes, dtype=np.intp)
+    d = np.asarray(destinos, dtype=np.intp)
+    return distancias(metrica, lat[o], lon[o], lat[d], lon[d])
@@ -0,0 +1,182 @@
+import math
+from typing import Optional, Tuple, List, Dict
+
+from modelo.grafo import Grafo
+from modelo.etiquetas import EtiquetasHub
+
+
+class MatrizParadas:
+    """
+    Matriz de caminos/distancias entre paradas que se conserva entre cálculos.
+
+    Mientras el grafo no cambie (misma ``Grafo.version``), agregar una parada
+    sólo calcula su fila y su columna, quitarla descarta las suyas y cambiar
+    el inicio o el fin equivale a quitar un punto y agregar otro.
+    """
+
+    def __init__(self, grafo: Grafo) -> None:
+        self.grafo = grafo
+        self.version = grafo.version
+        # puntos cuya fila y columna están calculadas
+        self.puntos: set = set()
+        # (origen, destino) → distancia (math.inf si no hay ruta)
+        self.distancias: Dict[Tuple[str, str], float] = {}
+        # (origen, destino) → camino; con un oráculo se rellena bajo demanda
+        self.caminos: Dict[Tuple[str, str], List[str]] = {}
+
+    def actualizar(self, puntos: List[str], oraculo: Optional[EtiquetasHub] = None) -> None:
+        """
+        Deja la matriz con exactamente los ``puntos`` indicados.
+
+        Si se pasa un oráculo de etiquetas vigente de este grafo, las filas y
+        columnas nuevas se obtienen de él (sólo distancias) y los caminos se
+        calculan después, únicamente para los tramos de la secuencia elegida.
+        """
+        if self.grafo.version != self.version:
+            # el grafo cambió: ninguna distancia anterior es fiable
+            self.puntos.clear()
+            self.distancias.clear()
+            self.caminos.clear()
+            self.version = self.grafo.version
+        if oraculo is not None and (oraculo.grafo is not self.grafo or not oraculo.vigente()):
+            oraculo = None
+
+        requeridos = list(dict.fromkeys(puntos))
+        retirados = self.puntos.difference(requeridos)
+        if retirados:
+            self.distancias = {
+                par: d for par, d in self.distancias.items()
+                if par[0] not in retirados and par[1] not in retirados
+            }
+            self.caminos = {
+                par: c for par, c in self.caminos.items()
+                if par[0] not in retirados and par[1] not in retirados
+            }
+            self.puntos -= retirados
+
+        nuevos = [p for p in requeridos if p not in self.puntos]
+        if not nuevos:
+            return
+        existentes = list(self.puntos)
+
+        if oraculo is not None:
+            # filas de los nuevos hacia todos y columnas de los existentes hacia los nuevos
+            for origen, fila in zip(nuevos, oraculo.matriz(nuevos, requeridos)):
+                for destino, d in zip(requeridos, fila):
+                    self.distancias[(origen, destino)] = d
+            if existentes:
+                for origen, fila in zip(existentes, oraculo.matriz(existentes, nuevos)):
+                    for destino, d in zip(nuevos, fila):
+                        self.distancias[(origen, destino)] = d
+            self.puntos.update(nuevos)
+            return
+
+        for punto in nuevos:
+            # fila: del nuevo punto a todos los demás (incluidos otros nuevos)
+            fila = self.grafo.dijkstra_a_varios(punto, requeridos)
+            for destino in requeridos:
+                self._guardar(punto, destino, fila.get(destino))
+            # columna: de los puntos ya calculados al nuevo, con una búsqueda inversa
+            if existentes:
+                columna = self.grafo.dijkstra_a_varios(punto, existentes, inverso=True)
+                for origen in existentes:
+                    self._guardar(origen, punto, columna.get(origen))
+            self.puntos.add(punto)
+            existentes.append(punto)
+
+    def _guardar(self, origen: str, destino: str, tramo: Optional[Tuple[List[str], float]]) -> None:
+        if tramo is None:
+            self.distancias[(origen, destino)] = math.inf
+        else:
+            self.caminos[(origen, destino)], self.distancias[(origen, destino)] = tramo
+
+    def distancia(self, origen: str, destino: str) -> float:
+        return self.distancias[(origen, destino)]
+
+    def camino(self, origen: str, destino: str) -> List[str]:
+        if (origen, destino) not in self.caminos:
+            camino, _ = self.grafo.dijkstra(origen, destino)
+            self.caminos[(origen, destino)] = camino
+        return self.caminos[(origen, destino)]
+
+    def primer_tramo_sin_ruta(self, puntos: List[str]) -> Optional[Tuple[str, str]]:
+        """Devuelve el primer par (origen, destino) sin ruta, o None si todos la tienen."""
+        for i, origen in enumerate(puntos):
+            for j, destino in enumerate(puntos):
+                if i != j and self.distancias[(origen, destino)] == math.inf:
+                    return origen, destino
+        return None
+
+    def mejor_orden(
+        self,
+        inicio: str,
+        fin: str,
+        waypoints: List[str],
+        previa: Optional[List[str]] = None,
+    ) -> Tuple[List[str], float]:
+        """
+        Busca el orden de ``waypoints`` que minimiza la distancia total.
+
+        Es una búsqueda exhaustiva con poda (ramificación y acotación). Si se
+        pasa la secuencia óptima de un cálculo anterior (``previa``), se adapta
+        a los puntos actuales y su coste sirve como cota inicial, lo que poda
+        casi todo el árbol cuando el usuario sólo ha hecho un cambio pequeño.
+        """
+        mejor_secuencia = self._adaptar_previa(inicio, fin, waypoints, previa)
+        mejor_distancia = self._coste(mejor_secuencia)
+
+        n = len(waypoints)
+        usados = [False] * n
+        parcial: List[str] = [inicio]
+
+        def explorar(actual: str, acumulado: float) -> None:
+            nonlocal mejor_distancia, mejor_secuencia
+            if len(parcial) == n + 1:
+                total = acumulado + self.distancia(actual, fin)
+                if total < mejor_distancia:
+                    mejor_distancia = total
+                    mejor_secuencia = parcial + [fin]
+                return
+            vistos = set()
+            for i, punto in enumerate(waypoints):
+                # paradas repetidas son intercambiables: basta con probar una
+                if usados[i] or punto in vistos:
+                    continue
+                vistos.add(punto)
+                coste = acumulado + self.distancia(actual, punto)
+                if coste >= mejor_distancia:
+                    continue
+                usados[i] = True
+                parcial.append(punto)
+                explorar(punto, coste)
+                parcial.pop()
+                usados[i] = False
+
+        explorar(inicio, 0.0)
+        return mejor_secuencia, mejor_distancia
+
+    def _adaptar_previa(
+        self, inicio: str, fin: str, waypoints: List[str], previa: Optional[List[str]]
+    ) -> List[str]:
+        # Conserva el orden previo de las paradas que siguen presentes
+        restantes = list(waypoints)
+        orden: List[str] = []
+        for punto in (previa or [])[1:-1]:
+            if punto in restantes:
+                restantes.remove(punto)
+                orden.append(punto)
+        # e inserta cada parada nueva en la posición más barata
+        for punto in restantes:
+            mejor_pos, mejor_coste = len(orden), math.inf
+            for pos in range(len(orden) + 1):
+                coste = self._coste([inicio] + orden[:pos] + [punto] + orden[pos:] + [fin])
+                if coste < mejor_coste:
+                    mejor_pos, mejor_coste = pos, coste
+            orden.insert(mejor_pos, punto)
+        return [inicio] + orden + [fin]
+
+    def _coste(self, secuencia: List[str]) -> float:
+        return sum(
+            self.distancia(secuencia[i], secuencia[i + 1])
+            for i in range(len(secuencia) - 1)
+        )
@@ -0,0 +1,321 @@
+"""
+Partición del grafo en celdas con una superposición de nodos frontera.
+
+El grafo se divide por bisección recursiva de coordenadas (siempre por el
+eje con más dispersión, en la mediana) hasta que cada celda tiene como mucho
+``max_nodos`` nodos. Cada celda es un ``Grafo`` independiente con sus aristas
+internas, su lista de nodos frontera (los que tocan una arista cortada) y
+las distancias internas entre ellos (atajos). La superposición une los nodos
+frontera con los atajos de cada celda y las aristas cortadas.
+
+Una consulta sólo recorre la celda de origen, la de destino y la
+superposición, así que cada celda puede vivir en otro proceso o máquina: el
+coordinador (``Particion``) sólo necesita la superposición y una forma de
+obtener cada celda (``proveedor``).
+"""
+
+import heapq
+import json
+import math
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from modelo.grafo import Grafo
+
+
+class Celda:
+    """Una parte del grafo: subgrafo interno, frontera y atajos entre fronteras."""
+
+    def __init__(
+        self,
+        id: int,
+        grafo: Grafo,
+        frontera: List[str],
+        atajos: Dict[Tuple[str, str], float],
+    ) -> None:
+        self.id = id
+        self.grafo = grafo
+        self.frontera = frontera
+        self.atajos = atajos
+
+    @classmethod
+    def construir(cls, id: int, grafo: Grafo, frontera: List[str]) -> "Celda":
+        """Calcula los atajos entre los nodos frontera de ``grafo``."""
+        atajos: Dict[Tuple[str, str], float] = {}
+        for origen in frontera:
+            for destino, (_, distancia) in grafo.dijkstra_a_varios(origen, frontera).items():
+                if destino != origen:
+                    atajos[(origen, destino)] = distancia
+        return cls(id, grafo, frontera, atajos)
+
+    # ---------- consultas locales -----------------------------------
+    def distancias_locales(self, nombre: str, inverso: bool = False) -> Dict[str, float]:
+        """
+        Distancias dentro de la celda desde ``nombre`` a cada nodo frontera
+        (o desde cada nodo frontera hasta ``nombre`` si ``inverso``).
+        """
+        resultado = self.grafo.dijkstra_a_varios(nombre, self.frontera, inverso)
+        return {n: d for n, (_, d) in resultado.items()}
+
+    def camino_local(self, origen: str, destino: str) -> Optional[Tuple[List[str], float]]:
+        return self.grafo.dijkstra(origen, destino)
+
+    # ---------- serialización ---------------------------------------
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "grafo": self.grafo.to_dict(),
+            "frontera": self.frontera,
+            "atajos": [[a, b, d] for (a, b), d in self.atajos.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Celda":
+        return cls(
+            data["id"],
+            Grafo.from_dict(data["grafo"]),
+            data["frontera"],
+            {(a, b): d for a, b, d in data["atajos"]},
+        )
+
+    def guardar(self, ruta: str) -> None:
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "Celda":
+        with open(ruta, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+class Particion:
+    """
+    Coordinador de una partición: conoce la celda de cada nodo y la
+    superposición (atajos + aristas cortadas) y pide a cada celda sus
+    búsquedas locales.
+    """
+
+    def __init__(
+        self,
+        celda_de: Dict[str, int],
+        atajos: Dict[Tuple[str, str], float],
+        cortadas: List[Tuple[str, str, float, bool]],
+        proveedor: Callable[[int], Celda],
+    ) -> None:
+        self.celda_de = celda_de
+        self.atajos = atajos
+        self.cortadas = cortadas
+        self.proveedor = proveedor
+
+        # grafo de superposición: nodo frontera → {vecino: peso}
+        self._superposicion: Dict[str, Dict[str, float]] = {}
+        for (a, b), d in atajos.items():
+            self._superposicion.setdefault(a, {})[b] = d
+        for origen, destino, peso, bidireccional in cortadas:
+            self._conectar(origen, destino, peso)
+            if bidireccional:
+                self._conectar(destino, origen, peso)
+
+    def _conectar(self, a: str, b: str, peso: float) -> None:
+        vecinos = self._superposicion.setdefault(a, {})
+        if peso < vecinos.get(b, math.inf):
+            vecinos[b] = peso
+
+    # ---------- construcción ----------------------------------------
+    @classmethod
+    def particionar(cls, grafo: Grafo, max_nodos: int = 1000) -> Tuple["Particion", List[Celda]]:
+        """Divide ``grafo`` y devuelve el coordinador y las celdas construidas."""
+        grupos = _biseccion(list(grafo.nodos), grafo, max_nodos)
+        celda_de = {nombre: i for i, grupo in enumerate(grupos) for nombre in grupo}
+
+        internas: List[List[Tuple[str, str, bool]]] = [[] for _ in grupos]
+        cortadas: List[Tuple[str, str, float, bool]] = []
+        fronteras: List[set] = [set() for _ in grupos]
+        for origen, destino, peso, bidireccional in _aristas_adyacencia(grafo):
+            ca, cb = celda_de[origen], celda_de[destino]
+            if ca == cb:
+                internas[ca].append((origen, destino, bidireccional))
+            else:
+                cortadas.append((origen, destino, peso, bidireccional))
+                fronteras[ca].add(origen)
+                fronteras[cb].add(destino)
+
+        celdas = []
+        for i, grupo in enumerate(grupos):
+            sub = Grafo(grafo.metrica)
+            with sub.lote():
+                for nombre in grupo:
+                    nodo = grafo.nodos[nombre]
+                    sub.agregar_nodo(nombre, nodo.latitud, nodo.longitud)
+                for origen, destino, bidireccional in internas[i]:
+                    sub.agregar_arista(origen, destino, bidireccional)
+            celdas.append(Celda.construir(i, sub, sorted(fronteras[i])))
+
+        atajos = {par: d for celda in celdas for par, d in celda.atajos.items()}
+        cargadas = {celda.id: celda for celda in celdas}
+        return cls(celda_de, atajos, cortadas, cargadas.__getitem__), celdas
+
+    # ---------- consultas -------------------------------------------
+    def ruta(self, inicio: str, fin: str) -> Optional[Tuple[List[str], float]]:
+        """Camino mínimo y distancia entre dos nodos de cualquier celda."""
+        local, por_superposicion = self._resolver(inicio, fin)
+        if por_superposicion is not None:
+            return self._expandir(inicio, fin, *por_superposicion)
+        return local
+
+    def distancia(self, inicio: str, fin: str) -> float:
+        """Como ``ruta`` pero sin reconstruir el camino dentro de las celdas."""
+        local, por_superposicion = self._resolver(inicio, fin)
+        mejor = por_superposicion or local
+        return math.inf if mejor is None else mejor[1]
+
+    def _resolver(self, inicio: str, fin: str):
+        # Devuelve (camino local, fronteras por la superposición); sólo uno
+        # de los dos (el mejor) es distinto de None
+        if inicio not in self.celda_de or fin not in self.celda_de:
+            raise KeyError("El nodo de inicio o fin no existe.")
+        celda_inicio = self.proveedor(self.celda_de[inicio])
+        celda_fin = self.proveedor(self.celda_de[fin])
+
+        # Candidato sin salir de la celda (sólo si comparten celda)
+        local: Optional[Tuple[List[str], float]] = None
+        if celda_inicio.id == celda_fin.id:
+            local = celda_inicio.camino_local(inicio, fin)
+
+        salidas = celda_inicio.distancias_locales(inicio)
+        llegadas = celda_fin.distancias_locales(fin, inverso=True)
+        if salidas and llegadas:
+            por_superposicion = self._buscar_en_superposicion(salidas, llegadas)
+            if por_superposicion is not None and (local is None or por_superposicion[1] < local[1]):
+                return None, por_superposicion
+        return local, None
+
+    def _buscar_en_superposicion(
+        self, salidas: Dict[str, float], llegadas: Dict[str, float]
+    ) -> Optional[Tuple[List[str], float]]:
+        # Dijkstra con varios orígenes (las fronteras de la celda de inicio)
+        dist: Dict[str, float] = dict(salidas)
+        previo: Dict[str, Optional[str]] = {n: None for n in salidas}
+        cola = [(d, n) for n, d in salidas.items()]
+        heapq.heapify(cola)
+        mejor, mejor_llegada = math.inf, None
+        while cola:
+            d, u = heapq.heappop(cola)
+            if d > dist[u]:
+                continue
+            if d >= mejor:
+                break
+            if u in llegadas and d + llegadas[u] < mejor:
+                mejor, mejor_llegada = d + llegadas[u], u
+            for v, peso in self._superposicion.get(u, {}).items():
+                alt = d + peso
+                if alt < dist.get(v, math.inf):
+                    dist[v] = alt
+                    previo[v] = u
+                    heapq.heappush(cola, (alt, v))
+
+        if mejor_llegada is None:
+            return None
+        fronteras: List[str] = []
+        actual: Optional[str] = mejor_llegada
+        while actual is not None:
+            fronteras.insert(0, actual)
+            actual = previo[actual]
+        return fronteras, mejor
+
+    def _expandir(
+        self, inicio: str, fin: str, fronteras: List[str], distancia: float
+    ) -> Tuple[List[str], float]:
+        # Sustituye cada atajo por su camino dentro de la celda
+        tramos = [(inicio, fronteras[0])]
+        tramos += list(zip(fronteras, fronteras[1:]))
+        tramos.append((fronteras[-1], fin))
+
+        camino = [inicio]
+        for a, b in tramos:
+            if a == b:
+                continue
+            if self.celda_de[a] == self.celda_de[b]:
+                local = self.proveedor(self.celda_de[a]).camino_local(a, b)
+                camino.extend(local[0][1:])
+            else:
+                # arista cortada entre dos celdas
+                camino.append(b)
+        return camino, distancia
+
+    # ---------- persistencia ----------------------------------------
+    def guardar(self, directorio: str, celdas: List[Celda]) -> None:
+        """Escribe la superposición y cada celda en su propio archivo."""
+        os.makedirs(directorio, exist_ok=True)
+        with open(os.path.join(directorio, "superposicion.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "celda_de": self.celda_de,
+                "atajos": [[a, b, d] for (a, b), d in self.atajos.items()],
+                "cortadas": [list(c) for c in self.cortadas],
+            }, f, ensure_ascii=False)
+        for celda in celdas:
+            celda.guardar(ruta_celda(directorio, celda.id))
+
+    @classmethod
+    def cargar(cls, directorio: str, proveedor: Optional[Callable[[int], Celda]] = None) -> "Particion":
+        """
+        Carga la superposición de ``directorio``. Sin ``proveedor``, cada celda
+        se lee de disco la primera vez que una consulta la necesita.
+        """
+        with open(os.path.join(directorio, "superposicion.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if proveedor is None:
+            cargadas: Dict[int, Celda] = {}
+
+            def proveedor(id: int) -> Celda:
+                if id not in cargadas:
+                    cargadas[id] = Celda.cargar(ruta_celda(directorio, id))
+                return cargadas[id]
+
+        return cls(
+            data["celda_de"],
+            {(a, b): d for a, b, d in data["atajos"]},
+            [tuple(c) for c in data["cortadas"]],
+            proveedor,
+        )
+
+
+def ruta_celda(directorio: str, id: int) -> str:
+    return os.path.join(directorio, f"celda_{id:05d}.json")
+
+
+def _aristas_adyacencia(grafo: Grafo):
+    """
+    Genera (origen, destino, peso, bidireccional) por cada arista de la
+    adyacencia, que es lo que recorren las búsquedas de ``Grafo`` (la lista
+    ``grafo.aristas`` puede conservar aristas que ya no están en ella). Los
+    dos sentidos de una arista bidireccional salen una sola vez.
+    """
+    for origen, vecinos in grafo.adyacencia.items():
+        for destino, id in vecinos.items():
+            bidireccional = grafo.adyacencia[destino].get(origen) == id
+            if bidireccional and destino < origen:
+                continue  # ya salió desde ``destino``
+            yield origen, destino, grafo.peso(origen, destino), bidireccional
+
+
+def _biseccion(nombres: List[str], grafo: Grafo, max_nodos: int) -> List[List[str]]:
+    """Bisección recursiva por coordenadas hasta grupos de ``max_nodos`` como mucho."""
+    grupos: List[List[str]] = []
+    pendientes = [nombres]
+    while pendientes:
+        grupo = pendientes.pop()
+        if len(grupo) <= max_nodos:
+            grupos.append(grupo)
+            continue
+        lats = [grafo.nodos[n].latitud for n in grupo]
+        lons = [grafo.nodos[n].longitud for n in grupo]
+        if max(lats) - min(lats) >= max(lons) - min(lons):
+            clave = lambda n: (grafo.nodos[n].latitud, n)
+        else:
+            clave = lambda n: (grafo.nodos[n].longitud, n)
+        grupo = sorted(grupo, key=clave)
+        mitad = len(grupo) // 2
+        pendientes.append(grupo[mitad:])
+        pendientes.append(grupo[:mitad])
+    return grupos
@@ -1,9 +1,24 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog, simpledialog
 from tkinter import font as tkfont
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib as mpl
+
+from vista.widgets import ListaVirtual, Autocompletado
+
+# A partir de este número de nodos la red base del mapa se compone con
+# teselas raster en caché (vista.teselas) en lugar de un artista por elemento
+UMBRAL_TESELAS = 2000
+
+# Cada cuánto se consultan los eventos de una carga en segundo plano
+INTERVALO_CARGA_MS = 50
+# Cada cuánto se comprueba si ha terminado de escribirse un guardado
+INTERVALO_GUARDADO_MS = 100
+# Tramo de la barra de progreso que ocupa cada fase de la carga
+FASES_CARGA = {
+    "leyendo": (0.0, 0.2),
+    "nodos": (0.2, 0.6),
+    "aristas": (0.6, 0.95),
+    "diario": (0.95, 1.0),
+}
 
 
 class Vista(tk.Tk):
@@ -12,6 +27,16 @@ class Vista(tk.Tk):
         self.title("Sistema de Navegación")
         self.geometry("1200x800")
         self.configure(bg="#f5f6fa")  # Color de fondo principal
+        # artistas del mapa base, para poder aplicar cambios incrementales
+        self._artistas_nodos = {}
+        self._artistas_aristas = {}
+        self._mapa_con_ruta = False
+        # caché de teselas del mapa base (sólo para grafos grandes)
+        self._teselas = None
+        self._mapa_en_teselas = False
+        # carga en segundo plano en curso y su vista previa en el mapa
+        self._carga = None
+        self._artistas_carga = []
         self._configurar_estilos()
         self._crear_menu()
         self._crear_widgets()
@@ -87,9 +112,21 @@ class Vista(tk.Tk):
         menubar.add_cascade(label="Archivo", menu=file_menu)
         file_menu.add_command(label="Guardar", command=self._guardar)
         file_menu.add_command(label="Cargar", command=self._cargar)
+        file_menu.add_command(label="Exportar...", command=self._exportar)
         file_menu.add_separator()
         file_menu.add_command(label="Salir", command=self.quit)
         
+        # Menú Métrica: cómo se calculan los pesos de los caminos
+        self.metrica = tk.StringVar(value="euclidea")
+        metric_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Métrica", menu=metric_menu)
+        for valor, etiqueta in (("euclidea", "Euclídea (grados)"),
+                                ("haversine", "Haversine (km)"),
+                                ("equirectangular", "Equirectangular (km)")):
+            metric_menu.add_radiobutton(label=etiqueta, value=valor,
+                                        variable=self.metrica,
+                                        command=self._cambiar_metrica)
+
         # Menú Ayuda
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Ayuda", menu=help_menu)
@@ -150,21 +187,16 @@ class Vista(tk.Tk):
         list_frame = ttk.LabelFrame(left_panel, text="Nodos Disponibles", padding="15", style="TLabelframe")
         list_frame.grid(row=1, column=0, padx=5, pady=5, sticky="ew")
         
-        # Lista de nodos con scrollbar y mejor estilo
-        scrollbar = ttk.Scrollbar(list_frame)
-        scrollbar.pack(side="right", fill="y")
-        
-        self.lista = tk.Listbox(list_frame, height=10, width=30, 
-                               yscrollcommand=scrollbar.set,
-                               font=("Segoe UI", 10),
-                               bg="#ffffff",
-                               fg="#2c3e50",
-                               selectbackground="#3498db",
-                               selectforeground="#ffffff",
-                               relief="flat",
-                               borderwidth=1)
-        self.lista.pack(side="left", fill="both", expand=True, padx=5, pady=5)
-        scrollbar.config(command=self.lista.yview)
+        # Lista de nodos virtualizada: sólo se crean las filas visibles
+        self.lista = ListaVirtual(list_frame, height=10, width=30,
+                                  font=("Segoe UI", 10),
+                                  bg="#ffffff",
+                                  fg="#2c3e50",
+                                  selectbackground="#3498db",
+                                  selectforeground="#ffffff",
+                                  relief="flat",
+                                  borderwidth=1)
+        self.lista.pack(side="left", fill="both", expand=True)
 
         # Frame para gestión de aristas
         edge_frame = ttk.LabelFrame(left_panel, text="Gestión de Caminos", padding="15", style="TLabelframe")
@@ -300,12 +332,57 @@ class Vista(tk.Tk):
         right_panel = ttk.LabelFrame(main_frame, text="Mapa", padding="15", style="TLabelframe")
         right_panel.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
         
+        # La figura de matplotlib se crea cuando el panel se muestra por primera
+        # vez: importar matplotlib y construir la figura retrasaría la ventana
+        self._panel_mapa = right_panel
+        self.fig = self.ax = self.canvas = None
+        right_panel.bind("<Map>", self._al_mostrar_mapa)
+
+        # Barra de estado con mejor estilo
+        self.status_bar = ttk.Label(self, 
+                                  text="Listo", 
+                                  relief="flat",
+                                  padding="5",
+                                  background="#2c3e50",
+                                  foreground="#ffffff",
+                                  font=("Segoe UI", 9))
+        self.status_bar.grid(row=1, column=0, sticky="ew")
+
+        # Progreso de la carga de archivos (oculto hasta que se carga uno)
+        self._frame_carga = ttk.Frame(self, padding="5", style="TFrame")
+        self._barra_carga = ttk.Progressbar(self._frame_carga, mode="determinate", maximum=100)
+        self._barra_carga.pack(side="left", fill="x", expand=True, padx=5)
+        tk.Button(self._frame_carga, text="Cancelar", command=self._cancelar_carga,
+                  bg="#e74c3c", fg="white", font=("Segoe UI", 9, "bold"),
+                  activebackground="#c0392b", activeforeground="white",
+                  relief="raised", bd=2, padx=5, pady=1).pack(side="left", padx=5)
+        self._frame_carga.grid(row=2, column=0, sticky="ew")
+        self._frame_carga.grid_remove()
+
+        # Autocompletado de nombres en todos los campos que esperan un nodo
+        for entry in (self.origen, self.destino, self.inicio, self.fin, self.waypoint_entry):
+            Autocompletado(entry, self._buscar_nodos)
+
+    def _al_mostrar_mapa(self, _evento=None):
+        self._panel_mapa.unbind("<Map>")
+        self.after_idle(self._asegurar_mapa)
+
+    def _asegurar_mapa(self) -> None:
+        """Importa matplotlib y crea la figura del mapa si aún no existe."""
+        if self.ax is not None:
+            return
+
+        import matplotlib as mpl
+        from matplotlib import style
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
         # Configurar estilo de matplotlib
         try:
-            plt.style.use('seaborn')
+            style.use('seaborn')
         except:
             # Si seaborn no está disponible, usar un estilo personalizado
-            plt.style.use('default')
+            style.use('default')
             mpl.rcParams.update({
                 'figure.facecolor': '#ffffff',
                 'axes.facecolor': '#ffffff',
@@ -317,28 +394,25 @@ class Vista(tk.Tk):
                 'grid.linestyle': '--',
                 'grid.alpha': 0.7
             })
-        
-        # Crear figura de matplotlib con estilo mejorado
-        self.fig, self.ax = plt.subplots(figsize=(8, 8), facecolor='#ffffff')
-        self.canvas = FigureCanvasTkAgg(self.fig, master=right_panel)
+
+        # Crear figura de matplotlib con estilo mejorado (sin pyplot, que no hace falta)
+        self.fig = Figure(figsize=(8, 8), facecolor='#ffffff')
+        self.ax = self.fig.add_subplot()
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self._panel_mapa)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
-        
+
         # Configurar el mapa con mejor estilo
         self.ax.set_title("Mapa de Nodos y Caminos", fontsize=12, pad=20)
         self.ax.set_xlabel("Longitud", fontsize=10, labelpad=10)
         self.ax.set_ylabel("Latitud", fontsize=10, labelpad=10)
         self.ax.grid(True, linestyle='--', alpha=0.7)
         self.fig.tight_layout()
+        self.canvas.draw_idle()
 
-        # Barra de estado con mejor estilo
-        self.status_bar = ttk.Label(self, 
-                                  text="Listo", 
-                                  relief="flat",
-                                  padding="5",
-                                  background="#2c3e50",
-                                  foreground="#ffffff",
-                                  font=("Segoe UI", 9))
-        self.status_bar.grid(row=1, column=0, sticky="ew")
+    def _buscar_nodos(self, texto):
+        if not self.controlador:
+            return []
+        return self.controlador.grafo.buscar_nodos(texto)
 
     def _limpiar_campos(self):
         self.nombre.delete(0, tk.END)
@@ -357,9 +431,18 @@ class Vista(tk.Tk):
                 defaultextension=".json",
                 filetypes=[("Archivo JSON", "*.json"), ("Todos los archivos", "*.*")],
             )
-            if ruta:
-                self.controlador.guardar_datos(ruta)
-                self.status_bar.config(text="Datos guardados exitosamente")
+            if ruta and self.controlador.guardar_datos(ruta):
+                # la instantánea se escribe en otro hilo: el resultado se
+                # muestra cuando termina
+                self.status_bar.config(text="Guardando...")
+                self.after(INTERVALO_GUARDADO_MS, self._vigilar_guardado)
+
+    def _vigilar_guardado(self):
+        estado = self.controlador.estado_guardado()
+        if estado == "guardando":
+            self.after(INTERVALO_GUARDADO_MS, self._vigilar_guardado)
+        elif estado == "guardado":
+            self.status_bar.config(text="Datos guardados exitosamente")
 
     def _cargar(self):
         if self.controlador:
@@ -367,8 +450,102 @@ class Vista(tk.Tk):
                 filetypes=[("Archivo JSON", "*.json"), ("Todos los archivos", "*.*")]
             )
             if ruta:
-                self.controlador.cargar_datos(ruta)
-                self.status_bar.config(text="Datos cargados exitosamente")
+                # El archivo se lee en otro hilo; el grafo actual sigue en uso
+                # hasta que la carga termina
+                carga = self.controlador.iniciar_carga(ruta)
+                if carga is None:
+                    return  # el controlador ya mostró el motivo
+                self._carga = carga
+                self._barra_carga["value"] = 0
+                self._frame_carga.grid()
+                self.status_bar.config(text=f"Cargando {ruta}...")
+                self.after(INTERVALO_CARGA_MS, self._vigilar_carga)
+
+    def _cancelar_carga(self):
+        if self._carga is not None:
+            self._carga.cancelar()
+            self.status_bar.config(text="Cancelando carga...")
+
+    def _vigilar_carga(self):
+        carga = self._carga
+        for evento in carga.eventos():
+            tipo = evento[0]
+            if tipo == "progreso":
+                self._avanzar_carga(*evento[1:])
+                continue
+            self._carga = None
+            self._frame_carga.grid_remove()
+            if tipo == "fin":
+                _, grafo, diario = evento
+                if carga.cancelada:
+                    # se canceló cuando ya había terminado: se descarta
+                    diario.cerrar()
+                else:
+                    self._artistas_carga = []  # el repintado completo los borra
+                    self.controlador.instalar_grafo(grafo, diario)
+                    self.status_bar.config(text="Datos cargados exitosamente")
+                    return
+            # el grafo actual sigue: recupera el diario que soltó la carga
+            self.controlador.abandonar_carga()
+            self._quitar_vista_previa()
+            if tipo == "error":
+                self.mostrar_error(f"Error al cargar: {evento[1]}")
+            else:
+                self.status_bar.config(text="Carga cancelada")
+            return
+        self.after(INTERVALO_CARGA_MS, self._vigilar_carga)
+
+    def _avanzar_carga(self, fase, hechos, total, bloque):
+        desde, hasta = FASES_CARGA[fase]
+        fraccion = hechos / total if total else 1.0
+        self._barra_carga["value"] = 100 * (desde + (hasta - desde) * fraccion)
+        if fase == "nodos" and bloque and self.ax is not None:
+            # Vista previa: los nodos que van llegando, sobre el mapa actual
+            lons = [n["lon"] for n in bloque]
+            lats = [n["lat"] for n in bloque]
+            self._artistas_carga.extend(self.ax.plot(
+                lons, lats, '.', color='#95a5a6', markersize=3, alpha=0.6,
+            ))
+            x0, x1 = self.ax.get_xlim()
+            y0, y1 = self.ax.get_ylim()
+            self.ax.set_xlim(min(x0, min(lons) - 0.1), max(x1, max(lons) + 0.1))
+            self.ax.set_ylim(min(y0, min(lats) - 0.1), max(y1, max(lats) + 0.1))
+            self.canvas.draw_idle()
+
+    def _quitar_vista_previa(self):
+        for artista in self._artistas_carga:
+            artista.remove()
+        self._artistas_carga = []
+        if self.ax is not None:
+            self._ajustar_limites()
+            self.canvas.draw_idle()
+
+    def _exportar(self):
+        if self.controlador:
+            ruta = filedialog.asksaveasfilename(
+                defaultextension=".geojson",
+                filetypes=[("GeoJSON", "*.geojson"), ("GeoJSON comprimido", "*.geojson.gz"),
+                           ("CSV", "*.csv"), ("CSV comprimido", "*.csv.gz"),
+                           ("Todos los archivos", "*.*")],
+            )
+            if not ruta:
+                return
+            tolerancia = 0.0
+            if self.controlador.rutas_mostradas:
+                tolerancia = simpledialog.askfloat(
+                    "Exportar",
+                    "Tolerancia para simplificar las rutas, en grados\n(0 = sin simplificar):",
+                    initialvalue=0.0, minvalue=0.0, parent=self,
+                )
+                if tolerancia is None:
+                    return  # operación cancelada
+            self.controlador.exportar(ruta, tolerancia)
+            self.status_bar.config(text="Datos exportados exitosamente")
+
+    def _cambiar_metrica(self):
+        if self.controlador:
+            self.controlador.cambiar_metrica(self.metrica.get())
+            self.status_bar.config(text=f"Métrica: {self.metrica.get()}")
 
     def _mostrar_acerca_de(self):
         messagebox.showinfo(
@@ -385,14 +562,14 @@ class Vista(tk.Tk):
             self.status_bar.config(text="Nodo agregado")
 
     def _editar(self):
-        if self.controlador and self.lista.curselection():
-            seleccionado = self.lista.get(tk.ACTIVE)
+        seleccionado = self.lista.seleccionado()
+        if self.controlador and seleccionado:
             self.controlador.editar(seleccionado, self.lat.get(), self.lon.get())
             self.status_bar.config(text="Nodo editado")
 
     def _eliminar(self):
-        if self.controlador and self.lista.curselection():
-            seleccionado = self.lista.get(tk.ACTIVE)
+        seleccionado = self.lista.seleccionado()
+        if self.controlador and seleccionado:
             self.controlador.eliminar(seleccionado)
             self.status_bar.config(text="Nodo eliminado")
 
@@ -482,12 +659,63 @@ class Vista(tk.Tk):
         self.controlador = controlador
 
     def actualizar_lista(self, nombres) -> None:
-        self.lista.delete(0, tk.END)
-        for n in sorted(nombres):
-            self.lista.insert(tk.END, n)
+        self.lista.establecer(sorted(nombres))
         self.status_bar.config(text=f"Lista actualizada: {len(nombres)} nodos")
 
-    def actualizar_aristas(self, aristas, camino=None, stops=None) -> None:
+    def aplicar_cambios(self, cambios) -> None:
+        """Actualiza la lista y el mapa sólo con lo que ha cambiado en el grafo."""
+        self._actualizar_lista_parcial(cambios)
+        if self._teselas is not None:
+            # antes de repintar, para no componer teselas obsoletas
+            self._teselas.invalidar(cambios)
+        if self.ax is None or self._mapa_con_ruta or self._mapa_en_teselas:
+            # la ruta mostrada puede haber dejado de ser válida: se repinta todo
+            self.actualizar_aristas(self.controlador.grafo.obtener_aristas())
+        else:
+            self._actualizar_mapa_parcial(cambios)
+
+    def _actualizar_lista_parcial(self, cambios) -> None:
+        for nombre in cambios.nodos_eliminados:
+            self.lista.eliminar(nombre)
+        for nombre in cambios.nodos_agregados:
+            self.lista.insertar(nombre)
+        self.status_bar.config(text=f"Lista actualizada: {len(self.lista)} nodos")
+
+    def _actualizar_mapa_parcial(self, cambios) -> None:
+        grafo = self.controlador.grafo
+        aristas_afectadas = (
+            cambios.aristas_agregadas | cambios.aristas_eliminadas | cambios.aristas_actualizadas
+        )
+        for clave in aristas_afectadas:
+            for artista in self._artistas_aristas.pop(clave, []):
+                artista.remove()
+        for nombre in cambios.nodos_eliminados | cambios.nodos_editados:
+            for artista in self._artistas_nodos.pop(nombre, []):
+                artista.remove()
+
+        redibujar = cambios.aristas_agregadas | cambios.aristas_actualizadas
+        if redibujar:
+            for origen, destino, peso, bidireccional in grafo.obtener_aristas():
+                if (origen, destino) in redibujar:
+                    self._artistas_aristas.setdefault((origen, destino), []).extend(
+                        self._dibujar_arista_base(origen, destino, bidireccional)
+                    )
+        for nombre in cambios.nodos_agregados | cambios.nodos_editados:
+            self._artistas_nodos[nombre] = self._dibujar_nodo(nombre, grafo.nodos[nombre])
+
+        self._ajustar_limites()
+        self.canvas.draw_idle()
+
+    def actualizar_aristas(self, aristas, camino=None, stops=None, rutas=None) -> None:
+        """
+        Repinta el mapa. ``camino``/``stops`` resaltan una ruta (numerando sus
+        segmentos si hay paradas); ``rutas`` es una lista de (camino, paradas)
+        por vehículo y dibuja cada una de un color.
+        """
+        self._asegurar_mapa()
+        self.metrica.set(self.controlador.grafo.metrica)
+        from matplotlib.lines import Line2D
+
         # Limpiar el mapa
         self.ax.clear()
         
@@ -509,35 +737,35 @@ class Vista(tk.Tk):
             "#d35400",  # naranja oscuro
         ]
 
+        # Tramos y nodos que forman parte de la ruta (o de las rutas de la flota)
+        caminos = [camino] if camino else [c for c, _ in (rutas or [])]
+        tramos_ruta = {(c[i], c[i+1]) for c in caminos for i in range(len(c)-1)}
+        nodos_ruta = {n for c in caminos for n in c}
+
         # Dibujar primero las aristas normales (no parte del camino)
-        for origen, destino, peso, bidireccional in aristas:
-            nodo_origen = self.controlador.grafo.nodos[origen]
-            nodo_destino = self.controlador.grafo.nodos[destino]
-            
-            # Solo dibujar si no es parte del camino
-            if not camino or (origen, destino) not in [(camino[i], camino[i+1]) for i in range(len(camino)-1)]:
-                self.ax.plot([nodo_origen.longitud, nodo_destino.longitud],
-                           [nodo_origen.latitud, nodo_destino.latitud], 
-                           color='#bdc3c7', alpha=0.3, linewidth=1)
-                
-                if not bidireccional:
-                    mid_x = (nodo_origen.longitud + nodo_destino.longitud) / 2
-                    mid_y = (nodo_origen.latitud + nodo_destino.latitud) / 2
-                    dx = nodo_destino.longitud - nodo_origen.longitud
-                    dy = nodo_destino.latitud - nodo_origen.latitud
-                    self.ax.arrow(mid_x, mid_y, dx/4, dy/4, 
-                                head_width=0.02, head_length=0.02, 
-                                fc='#bdc3c7', ec='#bdc3c7', alpha=0.3)
-
-        # Dibujar los nodos
-        for nombre, nodo in self.controlador.grafo.nodos.items():
-            if camino and nombre in camino:
-                self.ax.plot(nodo.longitud, nodo.latitud, 'go', markersize=10, alpha=0.8)
-            else:
-                self.ax.plot(nodo.longitud, nodo.latitud, 'bo', markersize=8, alpha=0.6)
-            self.ax.text(nodo.longitud, nodo.latitud, nombre, 
-                        fontsize=9, ha='center', va='bottom',
-                        bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=2))
+        self._artistas_aristas = {}
+        self._artistas_nodos = {}
+        self._mapa_con_ruta = bool(caminos)
+        self._mapa_en_teselas = len(self.controlador.grafo.nodos) > UMBRAL_TESELAS
+        if self._mapa_en_teselas:
+            # Mapa grande: la red base sale de la caché de teselas y encima
+            # sólo se dibujan los nodos de la ruta
+            self._componer_teselas()
+            for nombre in nodos_ruta:
+                self._dibujar_nodo(nombre, self.controlador.grafo.nodos[nombre], True)
+        else:
+            for origen, destino, peso, bidireccional in aristas:
+                # Solo dibujar si no es parte del camino
+                if (origen, destino) not in tramos_ruta:
+                    self._artistas_aristas.setdefault((origen, destino), []).extend(
+                        self._dibujar_arista_base(origen, destino, bidireccional)
+                    )
+
+            # Dibujar los nodos
+            for nombre, nodo in self.controlador.grafo.nodos.items():
+                self._artistas_nodos[nombre] = self._dibujar_nodo(
+                    nombre, nodo, nombre in nodos_ruta
+                )
 
         # Dibujar el camino con segmentos numerados
         if camino and stops:
@@ -572,22 +800,90 @@ class Vista(tk.Tk):
             legend_elements = []
             for i in range(len(stops) - 1):
                 color = colores_segmento[i % len(colores_segmento)]
-                legend_elements.append(plt.Line2D([0], [0], color=color, lw=2.5,
-                                               label=f'Segmento {i+1}: {stops[i]} → {stops[i+1]}'))
+                legend_elements.append(Line2D([0], [0], color=color, lw=2.5,
+                                           label=f'Segmento {i+1}: {stops[i]} → {stops[i+1]}'))
             self.ax.legend(handles=legend_elements, loc='upper right', 
                          bbox_to_anchor=(1.15, 1), fontsize=8)
 
+        # Dibujar las rutas de la flota, un color por vehículo
+        if rutas:
+            legend_elements = []
+            for k, (camino_vehiculo, paradas) in enumerate(rutas):
+                color = colores_segmento[k % len(colores_segmento)]
+                nodos = [self.controlador.grafo.nodos[n] for n in camino_vehiculo]
+                self.ax.plot([n.longitud for n in nodos], [n.latitud for n in nodos],
+                             color=color, alpha=0.9, linewidth=2.5)
+                legend_elements.append(Line2D([0], [0], color=color, lw=2.5,
+                                              label=f'Vehículo {k+1}: {paradas[0]} → {paradas[-1]} '
+                                                    f'({len(paradas) - 2} paradas)'))
+            self.ax.legend(handles=legend_elements, loc='upper right',
+                           bbox_to_anchor=(1.15, 1), fontsize=8)
+
         # Ajustar límites del mapa con margen
-        if self.controlador.grafo.nodos:
-            lats = [n.latitud for n in self.controlador.grafo.nodos.values()]
-            lons = [n.longitud for n in self.controlador.grafo.nodos.values()]
-            self.ax.set_xlim(min(lons) - 0.1, max(lons) + 0.1)
-            self.ax.set_ylim(min(lats) - 0.1, max(lats) + 0.1)
+        self._ajustar_limites()
 
         # Mejorar el aspecto general del mapa
         self.fig.tight_layout()
         self.canvas.draw()
 
+    def _dibujar_arista_base(self, origen, destino, bidireccional) -> list:
+        """Dibuja una arista fuera del camino y devuelve sus artistas."""
+        nodo_origen = self.controlador.grafo.nodos[origen]
+        nodo_destino = self.controlador.grafo.nodos[destino]
+        artistas = self.ax.plot([nodo_origen.longitud, nodo_destino.longitud],
+                                [nodo_origen.latitud, nodo_destino.latitud],
+                                color='#bdc3c7', alpha=0.3, linewidth=1)
+
+        if not bidireccional:
+            mid_x = (nodo_origen.longitud + nodo_destino.longitud) / 2
+            mid_y = (nodo_origen.latitud + nodo_destino.latitud) / 2
+            dx = nodo_destino.longitud - nodo_origen.longitud
+            dy = nodo_destino.latitud - nodo_origen.latitud
+            artistas.append(self.ax.arrow(mid_x, mid_y, dx/4, dy/4,
+                                          head_width=0.02, head_length=0.02,
+                                          fc='#bdc3c7', ec='#bdc3c7', alpha=0.3))
+        return artistas
+
+    def _dibujar_nodo(self, nombre, nodo, en_camino=False) -> list:
+        """Dibuja un nodo con su etiqueta y devuelve sus artistas."""
+        if en_camino:
+            artistas = self.ax.plot(nodo.longitud, nodo.latitud, 'go', markersize=10, alpha=0.8)
+        else:
+            artistas = self.ax.plot(nodo.longitud, nodo.latitud, 'bo', markersize=8, alpha=0.6)
+        artistas.append(self.ax.text(nodo.longitud, nodo.latitud, nombre,
+                                     fontsize=9, ha='center', va='bottom',
+                                     bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=2)))
+        return artistas
+
+    def _componer_teselas(self) -> None:
+        """Pinta la red base con las teselas en caché del grafo actual."""
+        from vista.teselas import CacheTeselas, zoom_para
+
+        grafo = self.controlador.grafo
+        if self._teselas is None or self._teselas.grafo is not grafo:
+            if self._teselas is not None:
+                self._teselas.cerrar()
+            self._teselas = CacheTeselas(grafo)
+        caja = self._limites()
+        if caja is not None:
+            ancho_px = int(self.fig.get_figwidth() * self.fig.dpi)
+            alto_px = int(self.fig.get_figheight() * self.fig.dpi)
+            self._teselas.componer(self.ax, caja, zoom_para(caja, ancho_px, alto_px))
+
+    def _limites(self):
+        """Caja (lon_min, lat_min, lon_max, lat_max) del grafo con margen, o None si está vacío."""
+        if not self.controlador.grafo.nodos:
+            return None
+        lats = [n.latitud for n in self.controlador.grafo.nodos.values()]
+        lons = [n.longitud for n in self.controlador.grafo.nodos.values()]
+        return min(lons) - 0.1, min(lats) - 0.1, max(lons) + 0.1, max(lats) + 0.1
+
+    def _ajustar_limites(self) -> None:
+        caja = self._limites()
+        if caja is not None:
+            self.ax.set_xlim(caja[0], caja[2])
+            self.ax.set_ylim(caja[1], caja[3])
+
     def mostrar_ruta(self, texto: str) -> None:
         self.lbl_ruta.config(text=texto)
 
@@ -604,8 +900,9 @@ def main():
     # importación diferida para evitar ciclo
     from controlador.controlador import Controlador
 
-    Controlador(vista)
+    controlador = Controlador(vista)
     vista.mainloop()
+    controlador.cerrar()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+"""
+Vista sin interfaz gráfica para manejar el ``Controlador`` desde scripts,
+pruebas de carga o un servicio: no importa Tk ni matplotlib y sólo recuerda
+el último resultado y los errores.
+"""
+
+from typing import List, Optional
+
+
+class VistaNula:
+    def __init__(self) -> None:
+        self.controlador = None
+        self.ultima_ruta: Optional[str] = None
+        self.ultimo_camino: Optional[list] = None
+        self.errores: List[str] = []
+
+    def set_controlador(self, controlador) -> None:
+        self.controlador = controlador
+
+    def actualizar_lista(self, nombres) -> None:
+        pass
+
+    def aplicar_cambios(self, cambios) -> None:
+        pass
+
+    def actualizar_aristas(self, aristas, camino=None, stops=None, rutas=None) -> None:
+        self.ultimo_camino = camino
+
+    def mostrar_ruta(self, texto: str) -> None:
+        self.ultima_ruta = texto
+
+    def mostrar_error(self, mensaje: str) -> None:
+        self.errores.append(mensaje)
@@ -0,0 +1,292 @@
+"""
+Teselas raster del mapa base (nodos y caminos) con caché.
+
+El mundo se divide como en el esquema WorldCRS84Quad: en el nivel de zoom
+``z`` hay ``2**(z+1) × 2**z`` teselas cuadradas de ``180 / 2**z`` grados, en
+longitud/latitud sin proyectar (igual que el mapa de la interfaz). Cada
+tesela se dibuja con el backend Agg, sin Tk, y se guarda como PNG
+transparente para poder componer rutas encima.
+
+La caché conoce la versión del grafo con la que está al día. Cuando el grafo
+cambia sólo se descartan las teselas cuya extensión toca los nodos o caminos
+afectados (en su posición anterior o en la nueva); el resto se conserva.
+"""
+
+import io
+import math
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.image import imread
+
+from modelo.grafo import Cambios, Grafo
+
+TAMANO_TESELA = 256
+ZOOM_MAXIMO = 30
+# margen, en píxeles, que puede ocupar un nodo alrededor de su centro
+MARGEN_PX = 8
+# teselas como máximo en una composición; una ventana normal necesita unas 20
+MAX_TESELAS_COMPOSICION = 64
+
+COLORES_RUTA = ["#e74c3c", "#e67e22", "#f1c40f", "#2ecc71", "#3498db", "#9b59b6"]
+
+Caja = Tuple[float, float, float, float]  # lon_min, lat_min, lon_max, lat_max
+
+
+def grados_por_tesela(zoom: int) -> float:
+    return 180.0 / 2 ** zoom
+
+
+def extension(zoom: int, x: int, y: int) -> Caja:
+    """Caja (lon_min, lat_min, lon_max, lat_max) de la tesela ``(zoom, x, y)``."""
+    t = grados_por_tesela(zoom)
+    return -180.0 + x * t, 90.0 - (y + 1) * t, -180.0 + (x + 1) * t, 90.0 - y * t
+
+
+def teselas_de(caja: Caja, zoom: int) -> Tuple[range, range]:
+    """Rangos de x e y de las teselas de ``zoom`` que tocan ``caja``."""
+    t = grados_por_tesela(zoom)
+    lon_min, lat_min, lon_max, lat_max = caja
+    ultimo_x, ultimo_y = 2 ** (zoom + 1) - 1, 2 ** zoom - 1
+    x0 = min(max(int(math.floor((lon_min + 180.0) / t)), 0), ultimo_x)
+    x1 = min(max(int(math.floor((lon_max + 180.0) / t)), 0), ultimo_x)
+    y0 = min(max(int(math.floor((90.0 - lat_max) / t)), 0), ultimo_y)
+    y1 = min(max(int(math.floor((90.0 - lat_min) / t)), 0), ultimo_y)
+    return range(x0, x1 + 1), range(y0, y1 + 1)
+
+
+def numero_teselas(caja: Caja, zoom: int) -> int:
+    xs, ys = teselas_de(caja, zoom)
+    return len(xs) * len(ys)
+
+
+def zoom_para(
+    caja: Caja, ancho_px: int, alto_px: int, max_teselas: int = MAX_TESELAS_COMPOSICION
+) -> int:
+    """
+    Menor zoom cuya resolución alcanza ``ancho_px × alto_px`` píxeles en
+    ``caja``, tomando el eje con más grados por píxel (en una red alta y
+    estrecha manda la altura), y sin pasar de ``max_teselas`` teselas.
+    """
+    grados_px = max((caja[2] - caja[0]) / ancho_px, (caja[3] - caja[1]) / alto_px)
+    if grados_px <= 0:
+        zoom = ZOOM_MAXIMO
+    else:
+        zoom = math.ceil(math.log2(180.0 / (TAMANO_TESELA * grados_px)))
+        zoom = min(max(zoom, 0), ZOOM_MAXIMO)
+    while zoom > 0 and numero_teselas(caja, zoom) > max_teselas:
+        zoom -= 1
+    return zoom
+
+
+class CacheTeselas:
+    """
+    Caché LRU de teselas PNG de un grafo.
+
+    Se suscribe al grafo para descartar las teselas afectadas por cada lote
+    de cambios. Quien dibuje a partir de las teselas dentro de su propio
+    observador debe llamar antes a ``invalidar`` con los mismos cambios, ya
+    que el orden de los observadores no está garantizado; la segunda llamada
+    no hace nada.
+    """
+
+    def __init__(self, grafo: Grafo, max_teselas: int = 1024, dpi: int = 100) -> None:
+        self.grafo = grafo
+        self.version = grafo.version
+        self.max_teselas = max_teselas
+        self.dpi = dpi
+        # (zoom, x, y) → PNG, en orden de uso
+        self._teselas: "OrderedDict[Tuple[int, int, int], bytes]" = OrderedDict()
+        # coordenadas de nodos y segmentos para la versión ``_version_arrays``
+        self._version_arrays = -1
+        self._nodos = np.empty((0, 2))
+        self._segmentos = np.empty((0, 2, 2))
+        self._vacia: Optional[bytes] = None
+        grafo.suscribir(self._al_cambiar)
+
+    def cerrar(self) -> None:
+        self.grafo.desuscribir(self._al_cambiar)
+
+    # ---------- invalidación ----------------------------------------
+    def _al_cambiar(self, cambios: Cambios) -> None:
+        self.invalidar(cambios)
+
+    def invalidar(self, cambios: Cambios) -> None:
+        """Descarta las teselas que tocan lo que ha cambiado en ``cambios``."""
+        if self.version == self.grafo.version:
+            return  # ya aplicado
+        self.version = self.grafo.version
+        if not self._teselas:
+            return
+
+        def posiciones(nombre: str) -> List[Tuple[float, float]]:
+            resultado = []
+            if nombre in cambios.posiciones_anteriores:
+                resultado.append(cambios.posiciones_anteriores[nombre])
+            nodo = self.grafo.nodos.get(nombre)
+            if nodo is not None:
+                resultado.append((nodo.latitud, nodo.longitud))
+            return resultado
+
+        cajas: List[Caja] = []
+        nodos = cambios.nodos_agregados | cambios.nodos_editados | cambios.nodos_eliminados
+        aristas = cambios.aristas_agregadas | cambios.aristas_eliminadas | cambios.aristas_actualizadas
+        grupos = [posiciones(n) for n in nodos]
+        grupos += [posiciones(o) + posiciones(d) for o, d in aristas]
+        for puntos in grupos:
+            if puntos:
+                lats = [p[0] for p in puntos]
+                lons = [p[1] for p in puntos]
+                cajas.append((min(lons), min(lats), max(lons), max(lats)))
+        self._descartar(cajas)
+
+    def _descartar(self, cajas: List[Caja]) -> None:
+        por_zoom: Dict[int, set] = {}
+        for clave in self._teselas:
+            por_zoom.setdefault(clave[0], set()).add(clave)
+        for zoom, claves in por_zoom.items():
+            margen = MARGEN_PX * grados_por_tesela(zoom) / TAMANO_TESELA
+            afectadas = set()
+            for lon_min, lat_min, lon_max, lat_max in cajas:
+                xs, ys = teselas_de(
+                    (lon_min - margen, lat_min - margen, lon_max + margen, lat_max + margen), zoom
+                )
+                if len(xs) * len(ys) <= len(claves):
+                    afectadas.update((zoom, x, y) for x in xs for y in ys)
+                else:
+                    afectadas.update(c for c in claves if c[1] in xs and c[2] in ys)
+            for clave in afectadas & claves:
+                del self._teselas[clave]
+
+    # ---------- dibujo ----------------------------------------------
+    def tesela(self, zoom: int, x: int, y: int) -> bytes:
+        """PNG de la tesela ``(zoom, x, y)``, de la caché o dibujada ahora."""
+        if self.version != self.grafo.version:
+            # el grafo cambió sin avisarnos (p. ej. tras ``cerrar``)
+            self._teselas.clear()
+            self.version = self.grafo.version
+        clave = (zoom, x, y)
+        png = self._teselas.get(clave)
+        if png is None:
+            png = self._dibujar(zoom, x, y)
+            self._teselas[clave] = png
+            while len(self._teselas) > self.max_teselas:
+                self._teselas.popitem(last=False)
+        else:
+            self._teselas.move_to_end(clave)
+        return png
+
+    def _actualizar_arrays(self) -> None:
+        if self._version_arrays == self.grafo.version:
+            return
+        nodos = self.grafo.nodos
+        self._nodos = np.array(
+            [(n.longitud, n.latitud) for n in nodos.values()], dtype=np.float64
+        ).reshape(-1, 2)
+        self._segmentos = np.array(
+            [
+                ((nodos[a.origen].longitud, nodos[a.origen].latitud),
+                 (nodos[a.destino].longitud, nodos[a.destino].latitud))
+                for a in self.grafo.aristas
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 2, 2)
+        self._version_arrays = self.grafo.version
+
+    def _dibujar(self, zoom: int, x: int, y: int) -> bytes:
+        self._actualizar_arrays()
+        lon_min, lat_min, lon_max, lat_max = extension(zoom, x, y)
+        margen = MARGEN_PX * grados_por_tesela(zoom) / TAMANO_TESELA
+
+        nodos = self._nodos[
+            (self._nodos[:, 0] >= lon_min - margen) & (self._nodos[:, 0] <= lon_max + margen)
+            & (self._nodos[:, 1] >= lat_min - margen) & (self._nodos[:, 1] <= lat_max + margen)
+        ]
+        s = self._segmentos
+        segmentos = s[
+            (np.minimum(s[:, 0, 0], s[:, 1, 0]) <= lon_max)
+            & (np.maximum(s[:, 0, 0], s[:, 1, 0]) >= lon_min)
+            & (np.minimum(s[:, 0, 1], s[:, 1, 1]) <= lat_max)
+            & (np.maximum(s[:, 0, 1], s[:, 1, 1]) >= lat_min)
+        ]
+        if not len(nodos) and not len(segmentos):
+            if self._vacia is None:
+                self._vacia = self._renderizar(lambda ax: None, (lon_min, lat_min, lon_max, lat_max))
+            return self._vacia
+
+        def pintar(ax) -> None:
+            # mismo estilo que el mapa vectorial de la interfaz
+            if len(segmentos):
+                ax.add_collection(LineCollection(segmentos, colors="#bdc3c7", alpha=0.3, linewidths=1))
+            if len(nodos):
+                ax.plot(nodos[:, 0], nodos[:, 1], "bo", markersize=8, alpha=0.6)
+
+        return self._renderizar(pintar, (lon_min, lat_min, lon_max, lat_max))
+
+    def _renderizar(
+        self,
+        pintar,
+        caja: Caja,
+        ancho: int = TAMANO_TESELA,
+        alto: int = TAMANO_TESELA,
+        transparente: bool = True,
+    ) -> bytes:
+        fig = Figure(figsize=(ancho / self.dpi, alto / self.dpi), dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_axes((0, 0, 1, 1))
+        ax.set_axis_off()
+        ax.set_xlim(caja[0], caja[2])
+        ax.set_ylim(caja[1], caja[3])
+        pintar(ax)
+        salida = io.BytesIO()
+        fig.savefig(salida, format="png", dpi=self.dpi, transparent=transparente,
+                    facecolor="#ffffff")
+        return salida.getvalue()
+
+    # ---------- composición -----------------------------------------
+    def componer(self, ax, caja: Caja, zoom: int) -> None:
+        """
+        Pinta en ``ax`` las teselas de ``zoom`` que cubren ``caja``. Si serían
+        más de ``MAX_TESELAS_COMPOSICION`` (o de las que caben en la caché,
+        y cada repintado las volvería a dibujar) se usa un zoom menor.
+        """
+        limite = min(MAX_TESELAS_COMPOSICION, self.max_teselas)
+        while zoom > 0 and numero_teselas(caja, zoom) > limite:
+            zoom -= 1
+        xs, ys = teselas_de(caja, zoom)
+        for x in xs:
+            for y in ys:
+                imagen = imread(io.BytesIO(self.tesela(zoom, x, y)), format="png")
+                lon_min, lat_min, lon_max, lat_max = extension(zoom, x, y)
+                ax.imshow(imagen, extent=(lon_min, lon_max, lat_min, lat_max),
+                          aspect="auto", interpolation="bilinear", zorder=0)
+
+    def mapa_estatico(
+        self,
+        caja: Caja,
+        ancho: int = 800,
+        alto: int = 600,
+        rutas: Iterable[Sequence[str]] = (),
+    ) -> bytes:
+        """
+        PNG de ``ancho × alto`` píxeles con la red de ``caja`` a partir de las
+        teselas y, encima, cada camino de ``rutas`` en su color.
+        """
+        zoom = zoom_para(caja, ancho, alto)
+        nodos = self.grafo.nodos
+
+        def pintar(ax) -> None:
+            self.componer(ax, caja, zoom)
+            for k, camino in enumerate(rutas):
+                color = COLORES_RUTA[k % len(COLORES_RUTA)]
+                ax.plot([nodos[n].longitud for n in camino], [nodos[n].latitud for n in camino],
+                        color=color, alpha=0.9, linewidth=2.5)
+            # imshow ajusta los límites a la imagen: se restauran
+            ax.set_xlim(caja[0], caja[2])
+            ax.set_ylim(caja[1], caja[3])
+
+        return self._renderizar(pintar, caja, ancho, alto, transparente=False)
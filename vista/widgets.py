@@ -0,0 +1,212 @@
+import bisect
+import tkinter as tk
+from tkinter import ttk
+from tkinter import font as tkfont
+
+
+class ListaVirtual(ttk.Frame):
+    """
+    Lista de nombres ordenados que sólo mantiene en el Listbox las filas
+    visibles. Los datos completos viven en una lista de Python; insertar o
+    eliminar un nombre sólo repinta si el cambio cae dentro de la ventana.
+    """
+
+    def __init__(self, master, height: int = 10, **opciones_listbox) -> None:
+        super().__init__(master, style="TFrame")
+        self._datos = []
+        self._inicio = 0
+        self._filas = height
+        self._seleccion = None  # índice en _datos
+
+        self._scrollbar = ttk.Scrollbar(self, command=self._desplazar)
+        self._scrollbar.pack(side="right", fill="y")
+        self._listbox = tk.Listbox(self, height=height, exportselection=False, **opciones_listbox)
+        self._listbox.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+
+        fuente = tkfont.Font(font=self._listbox.cget("font"))
+        self._alto_fila = fuente.metrics("linespace") + 1
+        self._listbox.bind("<Configure>", self._al_redimensionar)
+        self._listbox.bind("<<ListboxSelect>>", self._al_seleccionar)
+        self._listbox.bind("<MouseWheel>", self._al_rodar)
+        self._listbox.bind("<Button-4>", lambda e: self._desplazar("scroll", -1, "units"))
+        self._listbox.bind("<Button-5>", lambda e: self._desplazar("scroll", 1, "units"))
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    # ---------- datos -----------------------------------------------
+    def establecer(self, nombres) -> None:
+        """Sustituye todo el contenido (``nombres`` ya ordenados)."""
+        self._datos = list(nombres)
+        self._inicio = 0
+        self._seleccion = None
+        self._renderizar()
+
+    def insertar(self, nombre: str) -> None:
+        i = bisect.bisect_left(self._datos, nombre)
+        self._datos.insert(i, nombre)
+        if self._seleccion is not None and i <= self._seleccion:
+            self._seleccion += 1
+        self._tras_cambio(i, +1)
+
+    def eliminar(self, nombre: str) -> None:
+        i = bisect.bisect_left(self._datos, nombre)
+        if i >= len(self._datos) or self._datos[i] != nombre:
+            return
+        del self._datos[i]
+        if self._seleccion == i:
+            self._seleccion = None
+        elif self._seleccion is not None and i < self._seleccion:
+            self._seleccion -= 1
+        self._tras_cambio(i, -1)
+
+    def seleccionado(self):
+        """Nombre seleccionado o None."""
+        if self._seleccion is None:
+            return None
+        return self._datos[self._seleccion]
+
+    # ---------- renderizado -----------------------------------------
+    def _tras_cambio(self, indice: int, delta: int) -> None:
+        if indice < self._inicio:
+            # el cambio queda por encima de la ventana: se desplaza para que
+            # las filas visibles sigan siendo las mismas
+            self._inicio = max(0, self._inicio + delta)
+            self._actualizar_scrollbar()
+        elif indice < self._inicio + self._filas:
+            self._renderizar()
+        else:
+            self._actualizar_scrollbar()
+
+    def _renderizar(self) -> None:
+        self._inicio = max(0, min(self._inicio, len(self._datos) - self._filas))
+        visibles = self._datos[self._inicio:self._inicio + self._filas]
+        self._listbox.delete(0, tk.END)
+        if visibles:
+            self._listbox.insert(tk.END, *visibles)
+        if self._seleccion is not None and 0 <= self._seleccion - self._inicio < len(visibles):
+            self._listbox.selection_set(self._seleccion - self._inicio)
+        self._actualizar_scrollbar()
+
+    def _actualizar_scrollbar(self) -> None:
+        total = len(self._datos)
+        if total <= self._filas:
+            self._scrollbar.set(0.0, 1.0)
+        else:
+            self._scrollbar.set(self._inicio / total, (self._inicio + self._filas) / total)
+
+    # ---------- eventos ---------------------------------------------
+    def _desplazar(self, accion, cantidad, unidad=None):
+        if accion == "moveto":
+            self._inicio = int(float(cantidad) * len(self._datos))
+        elif accion == "scroll":
+            paso = self._filas if unidad == "pages" else 1
+            self._inicio += int(cantidad) * paso
+        self._renderizar()
+        return "break"
+
+    def _al_rodar(self, evento):
+        # Windows envía múltiplos de 120; macOS, pasos de ±1 que no deben redondearse a 0
+        if not evento.delta:
+            return "break"
+        pasos = max(1, abs(evento.delta) // 120)
+        return self._desplazar("scroll", (-1 if evento.delta > 0 else 1) * pasos, "units")
+
+    def _al_redimensionar(self, evento) -> None:
+        filas = max(1, evento.height // self._alto_fila)
+        if filas != self._filas:
+            self._filas = filas
+            self._renderizar()
+
+    def _al_seleccionar(self, _evento=None) -> None:
+        seleccion = self._listbox.curselection()
+        if seleccion:
+            self._seleccion = self._inicio + seleccion[0]
+
+
+class Autocompletado:
+    """
+    Desplegable de sugerencias bajo un ``ttk.Entry``.
+
+    ``buscar`` recibe el texto escrito y devuelve los nombres a sugerir (ya
+    ordenados por relevancia). Flechas para moverse, Intro/Tab o clic para
+    aceptar y Escape para cerrar.
+    """
+
+    _TECLAS_IGNORADAS = {"Up", "Down", "Return", "Tab", "Escape", "Shift_L", "Shift_R"}
+
+    def __init__(self, entry: ttk.Entry, buscar, maximo: int = 8) -> None:
+        self.entry = entry
+        self.buscar = buscar
+        self.maximo = maximo
+        self._ventana = None
+        self._listbox = None
+
+        entry.bind("<KeyRelease>", self._al_escribir, add="+")
+        entry.bind("<Down>", self._mover(1), add="+")
+        entry.bind("<Up>", self._mover(-1), add="+")
+        entry.bind("<Return>", self._aceptar, add="+")
+        entry.bind("<Tab>", self._aceptar, add="+")
+        entry.bind("<Escape>", lambda e: self._ocultar(), add="+")
+        entry.bind("<FocusOut>", lambda e: entry.after(150, self._ocultar), add="+")
+
+    def _al_escribir(self, evento) -> None:
+        if evento.keysym in self._TECLAS_IGNORADAS:
+            return
+        sugerencias = self.buscar(self.entry.get()) if self.entry.get().strip() else []
+        if sugerencias:
+            self._mostrar(sugerencias[:self.maximo])
+        else:
+            self._ocultar()
+
+    def _mostrar(self, sugerencias) -> None:
+        if self._ventana is None:
+            self._ventana = tk.Toplevel(self.entry)
+            self._ventana.wm_overrideredirect(True)
+            self._listbox = tk.Listbox(self._ventana, font=("Segoe UI", 10),
+                                       selectbackground="#3498db",
+                                       selectforeground="#ffffff",
+                                       relief="flat", borderwidth=1)
+            self._listbox.pack(fill="both", expand=True)
+            self._listbox.bind("<ButtonRelease-1>", self._aceptar)
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self._ventana.wm_geometry(f"+{x}+{y}")
+        self._listbox.config(height=len(sugerencias), width=max(self.entry.cget("width"), 20))
+        self._listbox.delete(0, tk.END)
+        self._listbox.insert(tk.END, *sugerencias)
+        self._listbox.selection_set(0)
+        self._ventana.deiconify()
+        self._ventana.lift()
+
+    def _ocultar(self) -> None:
+        if self._ventana is not None:
+            self._ventana.withdraw()
+
+    def _visible(self) -> bool:
+        return self._ventana is not None and self._ventana.winfo_viewable()
+
+    def _mover(self, paso: int):
+        def mover(_evento=None):
+            if not self._visible():
+                return None
+            actual = self._listbox.curselection()
+            i = (actual[0] if actual else -1) + paso
+            i = max(0, min(i, self._listbox.size() - 1))
+            self._listbox.selection_clear(0, tk.END)
+            self._listbox.selection_set(i)
+            self._listbox.see(i)
+            return "break"
+        return mover
+
+    def _aceptar(self, _evento=None):
+        if not self._visible():
+            return None
+        seleccion = self._listbox.curselection()
+        if seleccion:
+            self.entry.delete(0, tk.END)
+            self.entry.insert(0, self._listbox.get(seleccion[0]))
+            self.entry.icursor(tk.END)
+        self._ocultar()
+        self.entry.focus_set()
+        return "break"